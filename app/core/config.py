@@ -126,6 +126,10 @@ class Settings(BaseSettings):
         default=60000,
         description="Max serialized filled-field characters sent to bbox grounding.",
     )
+    validation_rule_workers: int = Field(
+        default=1,
+        description="Worker threads used to apply validation rules; 1 applies rules inline.",
+    )
     low_conf_threshold: float = Field(default=0.75)
     report_timezone: str = Field(default="UTC")
     preview_max_width: int = Field(default=1280)
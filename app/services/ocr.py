@@ -45,6 +45,18 @@ async def run_ocr(
     return {"doc_id": str(doc_id), "tokens": tokens}
 
 
+# Multiple of 3 bytes, so the base64 of consecutive blocks concatenates without padding.
+_BASE64_READ_BLOCK = 3 * 256 * 1024
+
+
+def _encode_file_base64(file_path: Path) -> str:
+    """Base64-encode a file block by block instead of reading it into memory whole."""
+    with file_path.open("rb") as handle:
+        return "".join(
+            base64.b64encode(block).decode("ascii") for block in iter(lambda: handle.read(_BASE64_READ_BLOCK), b"")
+        )
+
+
 async def _run_ocr_http(
     doc_id: uuid.UUID,
     file_path: Path,
@@ -63,12 +75,12 @@ async def _run_ocr_http(
         payload["file_name"] = file_name
 
     try:
-        file_bytes = file_path.read_bytes()
+        encoded_file = _encode_file_base64(file_path)
     except Exception:
-        file_bytes = None
+        encoded_file = None
 
-    if file_bytes is not None:
-        payload["file_bytes"] = base64.b64encode(file_bytes).decode("ascii")
+    if encoded_file is not None:
+        payload["file_bytes"] = encoded_file
         payload["file_suffix"] = file_path.suffix
 
     logger.debug(
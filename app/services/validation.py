@@ -4,14 +4,20 @@
 import difflib
 import operator
 import re
+import sys
 import uuid
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field as dc_field
 from collections import Counter, defaultdict
-from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from functools import lru_cache
+from itertools import chain, islice
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Sequence, Tuple
 
-from sqlalchemy import delete, select
+from sqlalchemy import and_, delete, insert, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.core.document_profiles import (
     get_active_document_type_values,
     get_active_document_types,
@@ -26,35 +32,46 @@ from app.services import document_versions
 from datetime import datetime, date
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ValidationMessage:
     rule_id: str
     severity: ValidationSeverity
     message: str
     refs: List[Dict[str, object]]
+    # Set when refs hold only JSON-native values, so storing them can skip _json_safe.
+    refs_json_safe: bool = False
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FieldRef:
     doc_type: str
     field_key: str
     label: Optional[str] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FieldComparisonRule:
     anchor_doc: str
     target_docs: List[str]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DateComparison:
     operator: str
     other: FieldRef
     note: Optional[str] = None
+    op_func: Callable[[Any, Any], bool] = dc_field(init=False, repr=False, compare=False)
+    op_text: str = dc_field(init=False, repr=False, compare=False)
 
+    def __post_init__(self) -> None:
+        op_func = _OPERATOR_FUNC.get(self.operator)
+        if op_func is None:
+            raise ValueError(f"Unsupported date comparison operator: {self.operator}")
+        object.__setattr__(self, "op_func", op_func)
+        object.__setattr__(self, "op_text", _OPERATOR_TEXT[self.operator])
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class DateRule:
     rule_id: str
     description: str
@@ -63,7 +80,7 @@ class DateRule:
     severity: ValidationSeverity = ValidationSeverity.ERROR
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AnchoredEqualityRule:
     rule_id: str
     description: str
@@ -73,7 +90,7 @@ class AnchoredEqualityRule:
     severity: ValidationSeverity = ValidationSeverity.ERROR
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class GroupEqualityRule:
     rule_id: str
     description: str
@@ -82,14 +99,14 @@ class GroupEqualityRule:
     severity: ValidationSeverity = ValidationSeverity.ERROR
 
 
-@dataclass
+@dataclass(slots=True)
 class FieldValueRecord:
     document: Document
     field: FilledField
     normalized: Any
 
 
-@dataclass
+@dataclass(slots=True)
 class InvalidFieldRecord:
     document: Document
     field: FilledField
@@ -147,29 +164,61 @@ def _ref_from_field(document: Document, field: Optional[FilledField], *, normali
         value=field.value,
         normalized=normalized,
         present=True,
-        page=getattr(field, "page", None),
-        bbox=getattr(field, "bbox", None),
-        token_refs=getattr(field, "token_refs", None),
+        page=field.page,
+        bbox=field.bbox,
+        token_refs=field.token_refs,
         note=note,
     )
 
-def _json_safe(value: Any) -> Any:
-    if isinstance(value, uuid.UUID):
-        return str(value)
-    # Normalize date/datetime to ISO strings for JSONB
-    if isinstance(value, (datetime, date)):
-        try:
-            return value.isoformat()
-        except Exception:
-            return str(value)
-    if isinstance(value, dict):
-        return {key: _json_safe(val) for key, val in value.items()}
-    if isinstance(value, (list, tuple)):
-        return [_json_safe(item) for item in value]
+
+def _json_identity(value: Any) -> Any:
     return value
 
 
-@dataclass
+def _json_isoformat(value: Any) -> Any:
+    # Normalize date/datetime to ISO strings for JSONB
+    try:
+        return value.isoformat()
+    except Exception:
+        return str(value)
+
+
+def _json_safe_dict(value: Dict[Any, Any]) -> Dict[Any, Any]:
+    return {key: _json_safe(val) for key, val in value.items()}
+
+
+def _json_safe_list(value: Iterable[Any]) -> List[Any]:
+    return [_json_safe(item) for item in value]
+
+
+# Conversions keyed on the exact type. Subclasses take the first entry they are an instance of,
+# so scalars come first and datetime precedes date.
+_JSON_HANDLERS: Dict[type, Callable[[Any], Any]] = {
+    str: _json_identity,
+    int: _json_identity,
+    float: _json_identity,
+    bool: _json_identity,
+    type(None): _json_identity,
+    uuid.UUID: str,
+    datetime: _json_isoformat,
+    date: _json_isoformat,
+    dict: _json_safe_dict,
+    list: _json_safe_list,
+    tuple: _json_safe_list,
+}
+
+
+def _json_safe(value: Any) -> Any:
+    handler = _JSON_HANDLERS.get(type(value))
+    if handler is None:
+        handler = next(
+            (candidate for base, candidate in _JSON_HANDLERS.items() if isinstance(value, base)),
+            _json_identity,
+        )
+    return handler(value)
+
+
+@dataclass(slots=True)
 class FieldCollection:
     ref: FieldRef
     records: List[FieldValueRecord]
@@ -179,17 +228,86 @@ class FieldCollection:
     unknown_doc_type: bool
 
 
+_NO_DOCUMENTS: Tuple[Document, ...] = ()
+# Shared read-only stand-in for documents without filled fields.
+_NO_FIELDS: Mapping[str, FilledField] = MappingProxyType({})
+
+
 class ValidationContext:
     """Helper that groups filled values by document type and field."""
 
-    def __init__(self, documents: List[Document], fields_by_doc: Dict[uuid.UUID, Dict[str, FilledField]]):
+    def __init__(
+        self,
+        documents: List[Document],
+        fields_by_doc: Dict[uuid.UUID, Dict[str, FilledField]],
+        refs: Iterable[FieldRef] = (),
+    ):
         self._documents = documents
         self._fields_by_doc = fields_by_doc
-        self._docs_by_type: Dict[DocumentType, List[Document]] = {}
+        docs_by_type: Dict[DocumentType, List[Document]] = defaultdict(list)
         for doc in documents:
-            self._docs_by_type.setdefault(doc.doc_type, []).append(doc)
+            docs_by_type[doc.doc_type].append(doc)
+        self._docs_by_type: Dict[DocumentType, Tuple[Document, ...]] = {
+            doc_type: tuple(docs) for doc_type, docs in docs_by_type.items()
+        }
+        self._field_index: Dict[Tuple[DocumentType, str], List[Tuple[Document, Optional[FilledField]]]] = {}
+        self._collections: Dict[Tuple[FieldRef, str], FieldCollection] = {}
+        self._rendered_refs: Dict[Tuple[FieldRef, str, bool, bool], List[Dict[str, Any]]] = {}
+        self.index_fields(_field_keys_by_doc_type(refs))
+
+    def index_fields(self, field_keys_by_doc_type: Dict[str, Iterable[str]]) -> None:
+        """Walk the documents of every doc type once, picking up all requested field keys."""
+        for doc_type_name, field_keys in field_keys_by_doc_type.items():
+            doc_type_enum = _resolve_doc_type(doc_type_name)
+            if doc_type_enum is None:
+                continue
+            keys = [key for key in field_keys if (doc_type_enum, key) not in self._field_index]
+            if not keys:
+                continue
+            entries: Dict[str, List[Tuple[Document, Optional[FilledField]]]] = {key: [] for key in keys}
+            for doc in self._docs_by_type.get(doc_type_enum, _NO_DOCUMENTS):
+                doc_fields = self._fields_by_doc.get(doc.id, _NO_FIELDS)
+                for key in keys:
+                    entries[key].append((doc, doc_fields.get(key)))
+            for key, key_entries in entries.items():
+                self._field_index[(doc_type_enum, key)] = key_entries
+
+    def _field_entries(self, doc_type_enum: DocumentType, field_key: str) -> List[Tuple[Document, Optional[FilledField]]]:
+        entries = self._field_index.get((doc_type_enum, field_key))
+        if entries is None:
+            # Refs outside the prebuilt index are indexed on first use.
+            entries = self._field_index[(doc_type_enum, field_key)] = [
+                (doc, self._fields_by_doc.get(doc.id, _NO_FIELDS).get(field_key))
+                for doc in self._docs_by_type.get(doc_type_enum, _NO_DOCUMENTS)
+            ]
+        return entries
+
+    def collect(self, ref: FieldRef, value_kind: str) -> FieldCollection:
+        """Return the collection for ``ref`` normalized as ``value_kind``, shared across rules."""
+        key = (ref, value_kind)
+        collection = self._collections.get(key)
+        if collection is None:
+            collection = self._collections[key] = self._collect(ref, value_kind)
+        return collection
+
+    def collection_refs(
+        self,
+        ref: FieldRef,
+        value_kind: str,
+        *,
+        with_doc_type: bool = True,
+        include_missing: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """Return the refs reported for a collected field; the cached list is shared between rules."""
+        key = (ref, value_kind, with_doc_type, include_missing)
+        refs = self._rendered_refs.get(key)
+        if refs is None:
+            refs = self._rendered_refs[key] = _render_collection_refs(
+                self.collect(ref, value_kind), with_doc_type=with_doc_type, include_missing=include_missing
+            )
+        return refs
 
-    def collect(self, ref: FieldRef, normalizer: Callable[[Optional[str]], Optional[Any]]) -> FieldCollection:
+    def _collect(self, ref: FieldRef, value_kind: str) -> FieldCollection:
         doc_type_enum = _resolve_doc_type(ref.doc_type)
         if doc_type_enum is None:
             return FieldCollection(
@@ -201,7 +319,7 @@ class ValidationContext:
                 unknown_doc_type=True,
             )
 
-        docs = self._docs_by_type.get(doc_type_enum, [])
+        docs = self._docs_by_type.get(doc_type_enum, _NO_DOCUMENTS)
         if not docs:
             return FieldCollection(
                 ref=ref,
@@ -212,16 +330,19 @@ class ValidationContext:
                 unknown_doc_type=False,
             )
 
+        normalizer = _NORMALIZERS.get(value_kind, _normalize_string_casefold)
+
         records: List[FieldValueRecord] = []
         missing_docs: List[Document] = []
         invalid_records: List[InvalidFieldRecord] = []
 
-        for doc in docs:
-            field = self._fields_by_doc.get(doc.id, {}).get(ref.field_key)
-            if field is None or not (field.value and field.value.strip()):
+        for doc, field in self._field_entries(doc_type_enum, ref.field_key):
+            value = field.value if field is not None else None
+            # isspace() answers the blank check without building a stripped copy; normalizers strip themselves.
+            if not value or value.isspace():
                 missing_docs.append(doc)
                 continue
-            normalized = normalizer(field.value)
+            normalized = normalizer(value)
             if normalized is None:
                 invalid_records.append(InvalidFieldRecord(document=doc, field=field))
                 continue
@@ -267,10 +388,18 @@ _OPERATOR_TEXT = {
 }
 
 
+# "<description>: <anchor label> in <file> (<doc>) = '<value>' must be <op> <other label> in <file> (<doc>) = '<value>'<note>"
+_DATE_MISMATCH_MESSAGE = "%s in %s (%s) = '%s' must be %s %s in %s (%s) = '%s'%s"
+
+
+_DOC_TYPE_BY_NAME: Dict[str, DocumentType] = dict(DocumentType.__members__)
+
+
 def _resolve_doc_type(name: str) -> Optional[DocumentType]:
-    return DocumentType.__members__.get(name)
+    return _DOC_TYPE_BY_NAME.get(name)
 
 
+@lru_cache(maxsize=256)
 def _humanize_identifier(identifier: str) -> str:
     return identifier.replace("_", " ").title()
 
@@ -285,14 +414,16 @@ def _collapse_spaces(value: str) -> str:
     return " ".join(value.split())
 
 
+@lru_cache(maxsize=4096)
 def _normalize_name_for_key(value: Optional[str]) -> Optional[str]:
     if value is None:
         return None
-    trimmed = value.strip()
-    if not trimmed:
+    # split() already drops leading/trailing whitespace, so no separate strip pass is needed.
+    collapsed = _collapse_spaces(value)
+    if not collapsed:
         return None
     # Case-insensitive comparison, preserve all symbols otherwise
-    return _collapse_spaces(trimmed).casefold()
+    return collapsed.casefold()
 
 
 def _normalize_weight_for_key(value: Optional[str]) -> Optional[str]:
@@ -332,26 +463,32 @@ def _collect_product_rows_for_doc(doc_fields: Dict[str, FilledField]) -> List[Di
     Expects keys like 'products.product_1.name_product'.
     Returns list of row dicts containing raw values per product.
     """
-    grouped: Dict[str, Dict[str, Optional[str]]] = defaultdict(dict)
+    grouped: Dict[str, Dict[str, Optional[str]]] = {}
     for key, field in doc_fields.items():
         if not key.startswith("products."):
             continue
-        parts = key.split(".")
+        # A bounded split yields the product id and the remaining sub key in one pass.
+        parts = key.split(".", 2)
         if len(parts) < 3:
             continue
         # parts[1] is product identifier; ignore template artifacts
-        prod_id = parts[1]
+        _, prod_id, sub_key = parts
         if prod_id == "product_template":
             continue
-        sub_key = ".".join(parts[2:])
-        grouped[prod_id][sub_key] = field.value
-        grouped[prod_id]["__id"] = prod_id  # keep original product_* id for refs
-    return [grouped[k] for k in sorted(grouped.keys())]
+        row = grouped.get(prod_id)
+        if row is None:
+            # keep original product_* id for refs
+            grouped[prod_id] = {sub_key: field.value, "__id": prod_id}
+        else:
+            row[sub_key] = field.value
+    return [grouped[k] for k in sorted(grouped)]
 
 
-def _build_product_multiset(rows: List[Dict[str, Optional[str]]]) -> Tuple[Counter, Dict[tuple, List[Dict[str, Optional[str]]]]]:
-    counter: Counter = Counter()
-    buckets: Dict[tuple, List[Dict[str, Optional[str]]]] = defaultdict(list)
+ProductMultiset = Tuple[Counter, Dict[tuple, List[Dict[str, Optional[str]]]]]
+
+
+def _build_product_multiset(rows: List[Dict[str, Optional[str]]]) -> ProductMultiset:
+    buckets: Dict[tuple, List[Dict[str, Optional[str]]]] = {}
     for row in rows:
         name = row.get("name_product")
         latin = row.get("latin_name")
@@ -360,9 +497,9 @@ def _build_product_multiset(rows: List[Dict[str, Optional[str]]]) -> Tuple[Count
         if key is None:
             # skip unidentifiable rows; higher-level rules may report missing name
             continue
-        counter[key] += 1
-        buckets[key].append(row)
-    return counter, buckets
+        buckets.setdefault(key, []).append(row)
+    # Counts follow from the buckets; keys keep first-seen order either way.
+    return Counter({key: len(bucket) for key, bucket in buckets.items()}), buckets
 
 
 def _prefer_anchor(documents: List[Document], rows_by_doc: Dict[uuid.UUID, List[Dict[str, Optional[str]]]]) -> Optional[Document]:
@@ -383,27 +520,42 @@ def _prefer_anchor(documents: List[Document], rows_by_doc: Dict[uuid.UUID, List[
     return best_doc
 
 
+PRODUCT_COMPARE_FIELDS = (
+    "name_product",
+    "latin_name",
+    "net_weight",
+    "size_product",
+    "unit_box",
+    "packages",
+    "gross_weight",
+    "price_per_unit",
+    "total_price",
+    "commodity_code",
+)
+_NAME_COMPARE_FIELDS = frozenset({"name_product", "latin_name"})
+
+
+# Normalizer used across all product comparisons
+def _value_for_compare(field_key: str, value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    if field_key in _NAME_COMPARE_FIELDS:
+        return _normalize_name_for_key(value)
+    return value.strip()
+
+
 def _compare_products(
     anchor_doc: Document,
     target_doc: Document,
-    rows_by_doc: Dict[uuid.UUID, List[Dict[str, Optional[str]]]],
+    anchor_products: ProductMultiset,
+    target_products: ProductMultiset,
     validations: List[ValidationMessage],
 ) -> None:
-    anchor_rows = rows_by_doc.get(anchor_doc.id, [])
-    target_rows = rows_by_doc.get(target_doc.id, [])
-
-    anchor_ms, anchor_buckets = _build_product_multiset(anchor_rows)
-    target_ms, target_buckets = _build_product_multiset(target_rows)
+    emit = validations.append
+    anchor_ms, anchor_buckets = anchor_products
+    target_ms, target_buckets = target_products
     both_have_product_data = bool(anchor_ms) and bool(target_ms)
 
-    # Normalizer used across all product comparisons
-    def _value_for_compare(field_key: str, value: Optional[str]) -> Optional[str]:
-        if value is None:
-            return None
-        if field_key in ("name_product", "latin_name"):
-            return _normalize_name_for_key(value)
-        return value.strip()
-
     def _summary_product_refs() -> List[Dict[str, Any]]:
         return [
             _build_ref(
@@ -422,27 +574,19 @@ def _compare_products(
             ),
         ]
 
-    # Missing in target
+    # Missing in target; keys present on both sides are collected on the same walk, in anchor order
     missing_in_target = False
+    matched_keys: List[tuple] = []
     for key, cnt in anchor_ms.items():
-        delta = cnt - target_ms.get(key, 0)
+        target_cnt = target_ms.get(key, 0)
+        if target_cnt:
+            matched_keys.append(key)
+        delta = cnt - target_cnt
         if delta > 0:
             missing_in_target = True
             # Collect detailed refs for missing rows from anchor
-            start_idx = target_ms.get(key, 0)
+            start_idx = target_cnt
             detailed_refs: List[Dict[str, Any]] = []
-            PRODUCT_COMPARE_FIELDS = [
-                "name_product",
-                "latin_name",
-                "net_weight",
-                "size_product",
-                "unit_box",
-                "packages",
-                "gross_weight",
-                "price_per_unit",
-                "total_price",
-                "commodity_code",
-            ]
             for idx in range(start_idx, cnt):
                 row_a = anchor_buckets[key][idx]
                 prod_id_a = row_a.get("__id", "?")
@@ -463,7 +607,7 @@ def _compare_products(
             detailed_refs.append(
                 _build_ref(doc_id=target_doc.id, field_key="products", note="missing_rows")
             )
-            validations.append(
+            emit(
                 ValidationMessage(
                     rule_id=f"products_missing_in_{target_doc.doc_type.name}",
                     severity=ValidationSeverity.ERROR,
@@ -472,7 +616,7 @@ def _compare_products(
                 )
             )
     if both_have_product_data and not missing_in_target:
-        validations.append(
+        emit(
             ValidationMessage(
                 rule_id=f"products_missing_in_{target_doc.doc_type.name}",
                 severity=ValidationSeverity.OK,
@@ -490,18 +634,6 @@ def _compare_products(
             # Detailed refs for extra rows from target
             start_idx = anchor_ms.get(key, 0)
             detailed_refs: List[Dict[str, Any]] = []
-            PRODUCT_COMPARE_FIELDS = [
-                "name_product",
-                "latin_name",
-                "net_weight",
-                "size_product",
-                "unit_box",
-                "packages",
-                "gross_weight",
-                "price_per_unit",
-                "total_price",
-                "commodity_code",
-            ]
             for idx in range(start_idx, cnt):
                 row_b = target_buckets[key][idx]
                 prod_id_b = row_b.get("__id", "?")
@@ -521,7 +653,7 @@ def _compare_products(
             detailed_refs.append(
                 _build_ref(doc_id=target_doc.id, field_key="products", note="extra_rows")
             )
-            validations.append(
+            emit(
                 ValidationMessage(
                     rule_id=f"products_extra_in_{target_doc.doc_type.name}",
                     severity=ValidationSeverity.WARN,
@@ -530,7 +662,7 @@ def _compare_products(
                 )
             )
     if both_have_product_data and not extra_in_target:
-        validations.append(
+        emit(
             ValidationMessage(
                 rule_id=f"products_extra_in_{target_doc.doc_type.name}",
                 severity=ValidationSeverity.OK,
@@ -540,7 +672,6 @@ def _compare_products(
         )
 
     # Count mismatch where both have entries
-    matched_keys = set(anchor_ms.keys()).intersection(set(target_ms.keys()))
     count_mismatch_found = False
     for key in matched_keys:
         a, b = anchor_ms[key], target_ms[key]
@@ -554,18 +685,7 @@ def _compare_products(
                 row_b = target_buckets[key][idx]
                 prod_id_a = row_a.get("__id", "?")
                 prod_id_b = row_b.get("__id", "?")
-                for fkey in [
-                    "name_product",
-                    "latin_name",
-                    "net_weight",
-                    "size_product",
-                    "unit_box",
-                    "packages",
-                    "gross_weight",
-                    "price_per_unit",
-                    "total_price",
-                    "commodity_code",
-                ]:
+                for fkey in PRODUCT_COMPARE_FIELDS:
                     vala = row_a.get(fkey)
                     valb = row_b.get(fkey)
                     if vala is not None:
@@ -591,7 +711,7 @@ def _compare_products(
             # Summary refs for counts
             detailed_refs.append(_build_ref(doc_id=anchor_doc.id, field_key="products", note=f"count={a}"))
             detailed_refs.append(_build_ref(doc_id=target_doc.id, field_key="products", note=f"count={b}"))
-            validations.append(
+            emit(
                 ValidationMessage(
                     rule_id=f"products_count_mismatch_{target_doc.doc_type.name}",
                     severity=ValidationSeverity.WARN,
@@ -600,7 +720,7 @@ def _compare_products(
                 )
             )
     if both_have_product_data and matched_keys and not count_mismatch_found:
-        validations.append(
+        emit(
             ValidationMessage(
                 rule_id=f"products_count_mismatch_{target_doc.doc_type.name}",
                 severity=ValidationSeverity.OK,
@@ -610,47 +730,37 @@ def _compare_products(
         )
 
     # Detailed field comparison for matched pairs
-    PRODUCT_COMPARE_FIELDS = [
-        "name_product",
-        "latin_name",
-        "net_weight",
-        "size_product",
-        "unit_box",
-        "packages",
-        "gross_weight",
-        "price_per_unit",
-        "total_price",
-        "commodity_code",
-    ]
     field_compared: Dict[str, bool] = {fkey: False for fkey in PRODUCT_COMPARE_FIELDS}
     field_mismatch_found: Dict[str, bool] = {fkey: False for fkey in PRODUCT_COMPARE_FIELDS}
     field_compared_refs: Dict[str, List[Dict[str, Any]]] = {fkey: [] for fkey in PRODUCT_COMPARE_FIELDS}
 
 
+    anchor_id = anchor_doc.id
+    target_id = target_doc.id
     for key in matched_keys:
-        pairs = min(anchor_ms[key], target_ms[key])
-        for idx in range(pairs):
-            row_a = anchor_buckets[key][idx]
-            row_b = target_buckets[key][idx]
-            prod_id_a = row_a.get("__id", "?")
-            prod_id_b = row_b.get("__id", "?")
+        # Buckets hold exactly as many rows as their counts, so zip pairs the first min(a, b) rows.
+        for row_a, row_b in zip(anchor_buckets[key], target_buckets[key]):
+            get_a = row_a.get
+            get_b = row_b.get
+            prod_id_a = get_a("__id", "?")
+            prod_id_b = get_b("__id", "?")
             for fkey in PRODUCT_COMPARE_FIELDS:
-                av = row_a.get(fkey)
-                bv = row_b.get(fkey)
+                av = get_a(fkey)
+                bv = get_b(fkey)
                 if av is None or bv is None:
                     continue
                 va = _value_for_compare(fkey, av)
                 vb = _value_for_compare(fkey, bv)
                 refs = [
                     _build_ref(
-                        doc_id=anchor_doc.id,
+                        doc_id=anchor_id,
                         field_key=f"products.{prod_id_a}.{fkey}",
                         value=av,
                         normalized=va,
                         present=True,
                     ),
                     _build_ref(
-                        doc_id=target_doc.id,
+                        doc_id=target_id,
                         field_key=f"products.{prod_id_b}.{fkey}",
                         value=bv,
                         normalized=vb,
@@ -661,7 +771,7 @@ def _compare_products(
                 field_compared_refs[fkey].extend(refs)
                 if va != vb:
                     field_mismatch_found[fkey] = True
-                    validations.append(
+                    emit(
                         ValidationMessage(
                             rule_id=f"product_field_mismatch_{fkey}",
                             severity=ValidationSeverity.WARN,
@@ -674,7 +784,7 @@ def _compare_products(
     if both_have_product_data:
         for fkey in PRODUCT_COMPARE_FIELDS:
             if field_compared[fkey] and not field_mismatch_found[fkey]:
-                validations.append(
+                emit(
                     ValidationMessage(
                         rule_id=f"product_field_mismatch_{fkey}",
                         severity=ValidationSeverity.OK,
@@ -688,36 +798,62 @@ def _field_label(field_key: str) -> str:
     return _humanize_identifier(field_key)
 
 
+@lru_cache(maxsize=4096)
 def _normalize_string(value: Optional[str]) -> Optional[str]:
     if value is None:
         return None
-    normalized = re.sub(r"\s+", " ", value).strip()
-    return normalized or None
+    normalized = _collapse_spaces(value)
+    # Interned results let equal values from different documents compare by identity.
+    return sys.intern(normalized) if normalized else None
 
 
+@lru_cache(maxsize=4096)
 def _normalize_string_casefold(value: Optional[str]) -> Optional[str]:
     normalized = _normalize_string(value)
     if normalized is None:
         return None
-    return normalized.casefold()
+    return sys.intern(normalized.casefold())
+
+
+_NUMBER_RE = re.compile(r"([0-9]+(?:\.[0-9]+)?)")
+
+
+@lru_cache(maxsize=4096)
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    if " " in value:
+        value = value.replace(" ", "")
+    match = _NUMBER_RE.search(value)
+    if not match:
+        return None
+    try:
+        return float(match.group(1))
+    except ValueError:
+        return None
 
 
-def _normalize_number(value: Optional[str]) -> Optional[float]:
-    return _parse_number(value)
+_DATE_FORMATS = (("-", "%Y-%m-%d"), (".", "%d.%m.%Y"), ("/", "%d/%m/%Y"), (".", "%Y.%m.%d"))
 
 
+@lru_cache(maxsize=4096)
 def _normalize_date(value: Optional[str]):
     if value is None:
         return None
     text = value.strip()
     if not text:
         return None
-    try:
-        return datetime.fromisoformat(text.replace("Z", "")).date()
-    except ValueError:
-        pass
-    formats = ["%Y-%m-%d", "%d.%m.%Y", "%d/%m/%Y", "%Y.%m.%d"]
-    for fmt in formats:
+    # ISO dates always open with a four-digit year; anything else would only raise here.
+    iso_text = text.replace("Z", "")
+    if iso_text[:4].isdigit():
+        try:
+            return datetime.fromisoformat(iso_text).date()
+        except ValueError:
+            pass
+    for separator, fmt in _DATE_FORMATS:
+        # A format can only match text containing its separator; skip the failing strptime call.
+        if separator not in text:
+            continue
         try:
             return datetime.strptime(text, fmt).date()
         except ValueError:
@@ -725,20 +861,24 @@ def _normalize_date(value: Optional[str]):
     return None
 
 
-def _normalize_value(value: Optional[str], kind: str) -> Optional[Any]:
-    if kind == "number":
-        return _normalize_number(value)
-    if kind == "string":
-        return _normalize_string(value)
-    if kind == "string-upper":
-        normalized = _normalize_string(value)
-        return normalized.upper() if normalized else None
-    # default string handling uses casefold for robustness
-    return _normalize_string_casefold(value)
+@lru_cache(maxsize=4096)
+def _normalize_string_upper(value: Optional[str]) -> Optional[str]:
+    normalized = _normalize_string(value)
+    return sys.intern(normalized.upper()) if normalized else None
+
+
+# Normalizers per rule value kind; other kinds fall back to casefolded strings for robustness.
+_NORMALIZERS: Dict[str, Callable[[Optional[str]], Optional[Any]]] = {
+    "date": _normalize_date,
+    "number": _parse_number,
+    "string": _normalize_string,
+    "string-upper": _normalize_string_upper,
+    "string-casefold": _normalize_string_casefold,
+}
 
 
 def _ref(doc_type: str, field_key: str, label: Optional[str] = None) -> FieldRef:
-    return FieldRef(doc_type=doc_type, field_key=field_key, label=label)
+    return FieldRef(doc_type=sys.intern(doc_type), field_key=sys.intern(field_key), label=label)
 
 
 def _refs(doc_types: Iterable[str], field_key: str, *, exclude: Optional[Iterable[str]] = None, label: Optional[str] = None) -> List[FieldRef]:
@@ -1306,6 +1446,29 @@ _register_field_comparison_rules()
 # Product-level group equality checks disabled (handled by per-product matcher)
 
 
+def _rule_refs(rule: Any) -> List[FieldRef]:
+    if isinstance(rule, DateRule):
+        return [rule.anchor, *(comparison.other for comparison in rule.comparisons)]
+    if isinstance(rule, AnchoredEqualityRule):
+        return [rule.anchor, *rule.targets]
+    if isinstance(rule, GroupEqualityRule):
+        return list(rule.refs)
+    return []
+
+
+def _field_keys_by_doc_type(refs: Iterable[FieldRef]) -> Dict[str, set[str]]:
+    field_keys: Dict[str, set[str]] = defaultdict(set)
+    for ref in refs:
+        field_keys[ref.doc_type].add(ref.field_key)
+    return dict(field_keys)
+
+
+# Every field the static rule tables touch; ValidationContext indexes these in one pass.
+_ALL_REFS: FrozenSet[FieldRef] = frozenset(
+    ref for rule in (*DATE_RULES, *ANCHORED_EQUALITY_RULES, *GROUP_EQUALITY_RULES) for ref in _rule_refs(rule)
+)
+
+
 def _normalized_doc_type_name(doc_type_name: Optional[str]) -> Optional[str]:
     if not doc_type_name:
         return None
@@ -1370,6 +1533,22 @@ def _filter_group_equality_rule(
     )
 
 
+@lru_cache(maxsize=16)
+def _active_anchored_equality_rules(active_doc_type_values: FrozenSet[str]) -> Tuple[AnchoredEqualityRule, ...]:
+    """Static anchored rules narrowed to one profile's doc types, built once per profile."""
+
+    filtered = (_filter_anchored_equality_rule(rule, active_doc_type_values) for rule in ANCHORED_EQUALITY_RULES)
+    return tuple(rule for rule in filtered if rule is not None)
+
+
+@lru_cache(maxsize=16)
+def _active_group_equality_rules(active_doc_type_values: FrozenSet[str]) -> Tuple[GroupEqualityRule, ...]:
+    """Static group rules narrowed to one profile's doc types, built once per profile."""
+
+    filtered = (_filter_group_equality_rule(rule, active_doc_type_values) for rule in GROUP_EQUALITY_RULES)
+    return tuple(rule for rule in filtered if rule is not None)
+
+
 def _filtered_field_comparison_rules(active_doc_type_values: set[str]) -> Dict[str, List[FieldComparisonRule]]:
     filtered: Dict[str, List[FieldComparisonRule]] = defaultdict(list)
     for field_key, rules in FIELD_COMPARISON_RULES.items():
@@ -1394,6 +1573,16 @@ def _field_matrix_config(document_profile: str) -> Tuple[List[str], Dict[str, st
     return get_field_matrix_doc_types(document_profile), doc_type_map
 
 
+def _emit_availability(
+    validations: List[ValidationMessage],
+    rule_id: str,
+    severity: ValidationSeverity,
+    message: str,
+    refs: List[Dict[str, object]],
+) -> None:
+    validations.append(ValidationMessage(rule_id=rule_id, severity=severity, message=message, refs=refs))
+
+
 def _collect_records_for_rule(
     context: ValidationContext,
     ref: FieldRef,
@@ -1403,27 +1592,15 @@ def _collect_records_for_rule(
     validations: List[ValidationMessage],
     missing_severity: ValidationSeverity = ValidationSeverity.WARN,
 ) -> List[FieldValueRecord]:
-    normalizer: Callable[[Optional[str]], Optional[Any]]
-    if value_kind == "date":
-        normalizer = _normalize_date
-    else:
-        normalizer = lambda value: _normalize_value(value, value_kind)
-
-    collection = context.collect(ref, normalizer)
-
-    def add(message: str, refs: List[Dict[str, object]]) -> None:
-        validations.append(
-            ValidationMessage(
-                rule_id=f"{rule_id}_availability",
-                severity=missing_severity,
-                message=message,
-                refs=refs,
-            )
-        )
+    collection = context.collect(ref, value_kind)
+    availability_rule_id = f"{rule_id}_availability"
 
     if collection.unknown_doc_type:
         # Emit placeholder ref for unknown doc type
-        add(
+        _emit_availability(
+            validations,
+            availability_rule_id,
+            missing_severity,
             f"{description}: document type '{ref.doc_type}' is not defined in the system",
             [
                 _build_ref(
@@ -1440,7 +1617,10 @@ def _collect_records_for_rule(
 
     if collection.doc_type_missing:
         # Placeholder ref for missing document type
-        add(
+        _emit_availability(
+            validations,
+            availability_rule_id,
+            missing_severity,
             f"{description}: documents of type {_doc_label(ref.doc_type)} are missing in the batch",
             [
                 _build_ref(
@@ -1455,7 +1635,10 @@ def _collect_records_for_rule(
         )
 
     for doc in collection.missing_docs:
-        add(
+        _emit_availability(
+            validations,
+            availability_rule_id,
+            missing_severity,
             f"{description}: field {context.field_label(ref)} missing in {doc.filename} ({ValidationContext.doc_label(doc)})",
             [
                 _build_ref(
@@ -1470,7 +1653,10 @@ def _collect_records_for_rule(
         )
 
     for record in collection.invalid_records:
-        add(
+        _emit_availability(
+            validations,
+            availability_rule_id,
+            missing_severity,
             f"{description}: field {context.field_label(ref)} in {record.document.filename} ({ValidationContext.doc_label(record.document)}) has unparseable value '{record.field.value}'",
             [
                 _build_ref(
@@ -1479,9 +1665,9 @@ def _collect_records_for_rule(
                     value=record.field.value,
                     normalized=None,
                     present=True,
-                    page=getattr(record.field, "page", None),
-                    bbox=getattr(record.field, "bbox", None),
-                    token_refs=getattr(record.field, "token_refs", None),
+                    page=record.field.page,
+                    bbox=record.field.bbox,
+                    token_refs=record.field.token_refs,
                     note="invalid_value",
                 )
             ],
@@ -1493,14 +1679,91 @@ def _collect_records_for_rule(
 def _format_value(value: Any) -> str:
     if value is None:
         return "<missing>"
-    if hasattr(value, "isoformat") and callable(value.isoformat):
-        try:
-            return value.isoformat()
-        except Exception:
-            pass
+    if isinstance(value, date):
+        return value.isoformat()
     return str(value)
 
 
+def _render_collection_refs(
+    coll: FieldCollection, *, with_doc_type: bool, include_missing: bool
+) -> List[Dict[str, Any]]:
+    ref = coll.ref
+    doc_type = ref.doc_type if with_doc_type else None
+    refs: List[Dict[str, Any]] = []
+    if coll.unknown_doc_type:
+        refs.append(_build_ref(doc_id=uuid.UUID(int=0), field_key=ref.field_key, present=False, note="unknown_doc_type", doc_type=doc_type))
+    if coll.doc_type_missing:
+        refs.append(_build_ref(doc_id=uuid.UUID(int=0), field_key=ref.field_key, present=False, note="missing_doc_type", doc_type=doc_type))
+    if include_missing:
+        for doc in coll.missing_docs:
+            refs.append(_build_ref(doc_id=doc.id, field_key=ref.field_key, present=False, note="missing_field", doc_type=doc_type))
+    for rec in coll.records:
+        refs.append(_ref_from_field(rec.document, rec.field, normalized=rec.normalized))
+    for inv in coll.invalid_records:
+        refs.append(
+            _build_ref(
+                doc_id=inv.document.id,
+                field_key=inv.field.field_key,
+                value=inv.field.value,
+                normalized=None,
+                present=True,
+                page=inv.field.page,
+                bbox=inv.field.bbox,
+                token_refs=inv.field.token_refs,
+                note="invalid_value",
+                doc_type=doc_type,
+            )
+        )
+    return refs
+
+
+def _dedupe_refs(refs: Iterable[Dict[str, Any]], *, with_doc_type: bool = True) -> List[Dict[str, Any]]:
+    """Drop repeated refs to the same field, keeping first-seen order."""
+    key_map: Dict[Tuple[Any, str, str, str], Dict[str, Any]] = {}
+    for r in refs:
+        k = (
+            r.get("doc_id"),
+            r.get("field_key") or "",
+            r.get("note") or "",
+            (r.get("doc_type") or "") if with_doc_type else "",
+        )
+        prev = key_map.setdefault(k, r)
+        # prefer present=True over present=False
+        if prev is not r and prev.get("present") is False and r.get("present") is True:
+            key_map[k] = r
+    return list(key_map.values())
+
+
+def _run_rules(apply_rule: Callable[[Any], List[ValidationMessage]], rules: Sequence[Any]) -> List[List[ValidationMessage]]:
+    """Apply independent rules, fanning out to worker threads when configured.
+
+    Results keep the order of ``rules`` so messages are emitted exactly as in a serial run.
+    """
+    workers = get_settings().validation_rule_workers
+    if workers <= 1 or len(rules) < 2:
+        return [apply_rule(rule) for rule in rules]
+    with ThreadPoolExecutor(max_workers=min(workers, len(rules))) as executor:
+        return list(executor.map(apply_rule, rules))
+
+
+def _date_range(records: List[FieldValueRecord]) -> Tuple[date, date]:
+    dates = [record.normalized for record in records]
+    return min(dates), max(dates)
+
+
+def _date_pairs_hold(
+    operator_symbol: str, anchor_range: Tuple[date, date], other_range: Tuple[date, date]
+) -> bool:
+    """Check every anchor/other pair at once from the (earliest, latest) dates of each side."""
+    anchor_low, anchor_high = anchor_range
+    other_low, other_high = other_range
+    if operator_symbol in ("<", "<="):
+        return _OPERATOR_FUNC[operator_symbol](anchor_high, other_low)
+    if operator_symbol in (">", ">="):
+        return _OPERATOR_FUNC[operator_symbol](anchor_low, other_high)
+    return anchor_low == anchor_high == other_low == other_high
+
+
 def _apply_date_rules(
     context: ValidationContext,
     validations: List[ValidationMessage],
@@ -1510,54 +1773,11 @@ def _apply_date_rules(
     rules = DATE_RULES if date_rules is None else date_rules
 
     def _gather_refs(ref: FieldRef) -> Tuple[List[Dict[str, Any]], List[FieldValueRecord], bool]:
-        coll = context.collect(ref, _normalize_date)
-        refs: List[Dict[str, Any]] = []
-        has_valid = False
-        if coll.unknown_doc_type:
-            refs.append(_build_ref(doc_id=uuid.UUID(int=0), field_key=ref.field_key, present=False, note="unknown_doc_type"))
-        if coll.doc_type_missing:
-            refs.append(_build_ref(doc_id=uuid.UUID(int=0), field_key=ref.field_key, present=False, note="missing_doc_type"))
-        for doc in coll.missing_docs:
-            refs.append(_build_ref(doc_id=doc.id, field_key=ref.field_key, present=False, note="missing_field"))
-        for rec in coll.records:
-            refs.append(_ref_from_field(rec.document, rec.field, normalized=rec.normalized))
-            has_valid = True
-        for inv in coll.invalid_records:
-            refs.append(
-                _build_ref(
-                    doc_id=inv.document.id,
-                    field_key=inv.field.field_key,
-                    value=inv.field.value,
-                    normalized=None,
-                    present=True,
-                    page=getattr(inv.field, "page", None),
-                    bbox=getattr(inv.field, "bbox", None),
-                    token_refs=getattr(inv.field, "token_refs", None),
-                    note="invalid_value",
-                )
-            )
-        return refs, coll.records, has_valid
-
-    def _dedupe(refs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        key_map: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
-        for r in refs:
-            did = str(r.get("doc_id"))
-            fkey = r.get("field_key") or ""
-            note = r.get("note") or ""
-            k = (did, fkey, note)
-            prev = key_map.get(k)
-            if prev is None:
-                key_map[k] = r
-            else:
-                # prefer present=True over present=False
-                if prev.get("present") is False and r.get("present") is True:
-                    key_map[k] = r
-        return list(key_map.values())
-
-    for source_rule in rules:
-        rule = _filter_date_rule(source_rule, active_doc_type_values)
-        if rule is None:
-            continue
+        coll = context.collect(ref, "date")
+        return context.collection_refs(ref, "date", with_doc_type=False), coll.records, bool(coll.records)
+
+    def _apply_rule(rule: DateRule) -> List[ValidationMessage]:
+        messages: List[ValidationMessage] = []
         anchor_refs, anchor_recs, anchor_valid = _gather_refs(rule.anchor)
         all_refs: List[Dict[str, Any]] = list(anchor_refs)
         any_other_valid = False
@@ -1568,10 +1788,10 @@ def _apply_date_rules(
             any_other_valid = any_other_valid or other_valid
             comparators.append((comparison, other_recs))
 
-        merged_refs = _dedupe(all_refs)
+        merged_refs = _dedupe_refs(all_refs, with_doc_type=False)
 
         if not anchor_valid or not any_other_valid:
-            validations.append(
+            messages.append(
                 ValidationMessage(
                     rule_id=f"{rule.rule_id}_availability",
                     severity=ValidationSeverity.WARN,
@@ -1579,41 +1799,45 @@ def _apply_date_rules(
                     refs=merged_refs,
                 )
             )
-            continue
+            return messages
 
-        # Compare all valid pairs and collect mismatches
-        op_results: List[Dict[str, Any]] = []
+        # Only the first mismatching pair is reported, so stop scanning once it is found
+        mismatch_message: Optional[str] = None
+        anchor_range = _date_range(anchor_recs)
         for comparison, other_recs in comparators:
-            op_func = _OPERATOR_FUNC.get(comparison.operator)
-            op_text = _OPERATOR_TEXT.get(comparison.operator, comparison.operator)
-            if op_func is None:
+            if not other_recs:
                 continue
-            note_suffix = f" ({comparison.note})" if comparison.note else ""
-            for a in anchor_recs:
-                for b in other_recs:
-                    if not op_func(a.normalized, b.normalized):
-                        op_results.append(
-                            {
-                                "message": (
-                                    f"{rule.description}: {context.field_label(rule.anchor)} in {a.document.filename}"
-                                    f" ({ValidationContext.doc_label(a.document)}) = '{_format_value(a.field.value)}' must be {op_text}"
-                                    f" {context.field_label(comparison.other)} in {b.document.filename}"
-                                    f" ({ValidationContext.doc_label(b.document)}) = '{_format_value(b.field.value)}'{note_suffix}"
-                                )
-                            }
-                        )
-        if op_results:
+            if _date_pairs_hold(comparison.operator, anchor_range, _date_range(other_recs)):
+                continue
+            op_func = comparison.op_func
+            a, b = next(
+                (a, b) for a in anchor_recs for b in other_recs if not op_func(a.normalized, b.normalized)
+            )
+            mismatch_message = _DATE_MISMATCH_MESSAGE % (
+                f"{rule.description}: {context.field_label(rule.anchor)}",
+                a.document.filename,
+                ValidationContext.doc_label(a.document),
+                _format_value(a.field.value),
+                comparison.op_text,
+                context.field_label(comparison.other),
+                b.document.filename,
+                ValidationContext.doc_label(b.document),
+                _format_value(b.field.value),
+                f" ({comparison.note})" if comparison.note else "",
+            )
+            break
+        if mismatch_message is not None:
             # Emit single violation block with merged refs; use first message for readability
-            validations.append(
+            messages.append(
                 ValidationMessage(
                     rule_id=rule.rule_id,
                     severity=rule.severity,
-                    message=op_results[0]["message"],
+                    message=mismatch_message,
                     refs=merged_refs,
                 )
             )
         else:
-            validations.append(
+            messages.append(
                 ValidationMessage(
                     rule_id=rule.rule_id,
                     severity=ValidationSeverity.OK,
@@ -1621,6 +1845,14 @@ def _apply_date_rules(
                     refs=merged_refs,
                 )
             )
+        return messages
+
+    filtered_rules = [
+        rule
+        for rule in (_filter_date_rule(source_rule, active_doc_type_values) for source_rule in rules)
+        if rule is not None
+    ]
+    validations.extend(chain.from_iterable(_run_rules(_apply_rule, filtered_rules)))
 
 
 def _apply_anchored_equality_rules(
@@ -1628,61 +1860,12 @@ def _apply_anchored_equality_rules(
     validations: List[ValidationMessage],
     active_doc_type_values: set[str],
 ) -> None:
-    def _norm_kind(kind: str):
-        if kind == "date":
-            return _normalize_date
-        return lambda v: _normalize_value(v, kind)
-
     def _gather(ref: FieldRef, kind: str) -> Tuple[List[Dict[str, Any]], List[FieldValueRecord], bool]:
-        coll = context.collect(ref, _norm_kind(kind))
-        refs: List[Dict[str, Any]] = []
-        has_valid = False
-        if coll.unknown_doc_type:
-            refs.append(_build_ref(doc_id=uuid.UUID(int=0), field_key=ref.field_key, present=False, note="unknown_doc_type", doc_type=ref.doc_type))
-        if coll.doc_type_missing:
-            refs.append(_build_ref(doc_id=uuid.UUID(int=0), field_key=ref.field_key, present=False, note="missing_doc_type", doc_type=ref.doc_type))
-        for doc in coll.missing_docs:
-            refs.append(_build_ref(doc_id=doc.id, field_key=ref.field_key, present=False, note="missing_field", doc_type=ref.doc_type))
-        for rec in coll.records:
-            refs.append(_ref_from_field(rec.document, rec.field, normalized=rec.normalized))
-            has_valid = True
-        for inv in coll.invalid_records:
-            refs.append(
-                _build_ref(
-                    doc_id=inv.document.id,
-                    field_key=inv.field.field_key,
-                    value=inv.field.value,
-                    normalized=None,
-                    present=True,
-                    page=getattr(inv.field, "page", None),
-                    bbox=getattr(inv.field, "bbox", None),
-                    token_refs=getattr(inv.field, "token_refs", None),
-                    note="invalid_value",
-                    doc_type=ref.doc_type,
-                )
-            )
-        return refs, coll.records, has_valid
-
-    def _dedupe(refs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        key_map: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
-        for r in refs:
-            did = str(r.get("doc_id"))
-            fkey = r.get("field_key") or ""
-            note = r.get("note") or ""
-            dtype = r.get("doc_type") or ""
-            k = (did, fkey, note, dtype)
-            prev = key_map.get(k)
-            if prev is None:
-                key_map[k] = r
-            else:
-                if prev.get("present") is False and r.get("present") is True:
-                    key_map[k] = r
-        return list(key_map.values())
+        coll = context.collect(ref, kind)
+        return context.collection_refs(ref, kind), coll.records, bool(coll.records)
 
-    for source_rule in ANCHORED_EQUALITY_RULES:
-        rule = _filter_anchored_equality_rule(source_rule, active_doc_type_values)
-        if rule is None:
-            continue
+    def _apply_rule(rule: AnchoredEqualityRule) -> List[ValidationMessage]:
+        messages: List[ValidationMessage] = []
         all_refs: List[Dict[str, Any]] = []
         anchor_refs, anchor_recs, anchor_valid = _gather(rule.anchor, rule.value_kind)
         all_refs.extend(anchor_refs)
@@ -1694,10 +1877,10 @@ def _apply_anchored_equality_rules(
             targets_data.append((t, rrecs, rvalid))
             any_target_valid = any_target_valid or rvalid
 
-        merged_refs = _dedupe(all_refs)
+        merged_refs = _dedupe_refs(all_refs)
 
         if not anchor_valid or not any_target_valid:
-            validations.append(
+            messages.append(
                 ValidationMessage(
                     rule_id=f"{rule.rule_id}_availability",
                     severity=ValidationSeverity.WARN,
@@ -1705,12 +1888,12 @@ def _apply_anchored_equality_rules(
                     refs=merged_refs,
                 )
             )
-            continue
+            return messages
 
         # Determine canonical from first anchor record
         canonical = anchor_recs[0].normalized
         if canonical is None:
-            validations.append(
+            messages.append(
                 ValidationMessage(
                     rule_id=f"{rule.rule_id}_availability",
                     severity=ValidationSeverity.WARN,
@@ -1718,26 +1901,16 @@ def _apply_anchored_equality_rules(
                     refs=merged_refs,
                 )
             )
-            continue
+            return messages
 
-        mismatch_found = False
-        # Check disagreement between anchors
-        for a in anchor_recs[1:]:
-            if a.normalized != canonical:
-                mismatch_found = True
-                break
-        # Check targets
-        if not mismatch_found:
-            for t, recs, _ in targets_data:
-                for rec in recs:
-                    if rec.normalized != canonical:
-                        mismatch_found = True
-                        break
-                if mismatch_found:
-                    break
+        # Stop at the first anchor or target record that disagrees with the canonical value
+        mismatch_found = any(
+            rec.normalized != canonical
+            for rec in chain(islice(anchor_recs, 1, None), *(recs for _, recs, _ in targets_data))
+        )
 
         if mismatch_found:
-            validations.append(
+            messages.append(
                 ValidationMessage(
                     rule_id=rule.rule_id,
                     severity=rule.severity,
@@ -1746,7 +1919,7 @@ def _apply_anchored_equality_rules(
                 )
             )
         else:
-            validations.append(
+            messages.append(
                 ValidationMessage(
                     rule_id=rule.rule_id,
                     severity=ValidationSeverity.OK,
@@ -1754,6 +1927,10 @@ def _apply_anchored_equality_rules(
                     refs=merged_refs,
                 )
             )
+        return messages
+
+    filtered_rules = _active_anchored_equality_rules(frozenset(active_doc_type_values))
+    validations.extend(chain.from_iterable(_run_rules(_apply_rule, filtered_rules)))
 
 
 def _apply_group_equality_rules(
@@ -1761,94 +1938,41 @@ def _apply_group_equality_rules(
     validations: List[ValidationMessage],
     active_doc_type_values: set[str],
 ) -> None:
-    def _norm_kind(kind: str):
-        if kind == "date":
-            return _normalize_date
-        return lambda v: _normalize_value(v, kind)
-
-    def _gather(ref: FieldRef, kind: str, *, include_missing: bool = True) -> Tuple[List[Dict[str, Any]], List[FieldValueRecord], bool]:
-        coll = context.collect(ref, _norm_kind(kind))
-        refs: List[Dict[str, Any]] = []
-        has_valid = False
-        if coll.unknown_doc_type:
-            refs.append(_build_ref(doc_id=uuid.UUID(int=0), field_key=ref.field_key, present=False, note="unknown_doc_type", doc_type=ref.doc_type))
-        if coll.doc_type_missing:
-            refs.append(_build_ref(doc_id=uuid.UUID(int=0), field_key=ref.field_key, present=False, note="missing_doc_type", doc_type=ref.doc_type))
-        if include_missing:
-            for doc in coll.missing_docs:
-                refs.append(_build_ref(doc_id=doc.id, field_key=ref.field_key, present=False, note="missing_field", doc_type=ref.doc_type))
-        for rec in coll.records:
-            refs.append(_ref_from_field(rec.document, rec.field, normalized=rec.normalized))
-            has_valid = True
-        for inv in coll.invalid_records:
-            refs.append(
-                _build_ref(
-                    doc_id=inv.document.id,
-                    field_key=inv.field.field_key,
-                    value=inv.field.value,
-                    normalized=None,
-                    present=True,
-                    page=getattr(inv.field, "page", None),
-                    bbox=getattr(inv.field, "bbox", None),
-                    token_refs=getattr(inv.field, "token_refs", None),
-                    note="invalid_value",
-                    doc_type=ref.doc_type,
-                )
-            )
-        return refs, coll.records, has_valid
-
-    def _dedupe(refs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        key_map: Dict[Tuple[str, str, str, str], Dict[str, Any]] = {}
-        for r in refs:
-            did = str(r.get("doc_id"))
-            fkey = r.get("field_key") or ""
-            note = r.get("note") or ""
-            dtype = r.get("doc_type") or ""
-            k = (did, fkey, note, dtype)
-            prev = key_map.get(k)
-            if prev is None:
-                key_map[k] = r
-            else:
-                if prev.get("present") is False and r.get("present") is True:
-                    key_map[k] = r
-        return list(key_map.values())
-
-    for source_rule in GROUP_EQUALITY_RULES:
-        rule = _filter_group_equality_rule(source_rule, active_doc_type_values)
-        if rule is None:
-            continue
-        all_refs: List[Dict[str, Any]] = []
-        groups: Dict[Any, List[FieldValueRecord]] = {}
-        has_any_valid = False
+    def _apply_rule(rule: GroupEqualityRule) -> List[ValidationMessage]:
+        messages: List[ValidationMessage] = []
         suppress_missing = False
+        value_kind = rule.value_kind
         if rule.rule_id == "container_number_alignment":
             invoice_ref = next((ref for ref in rule.refs if ref.doc_type == "INVOICE"), None)
             if invoice_ref is not None:
-                _, invoice_records, _ = _gather(invoice_ref, rule.value_kind, include_missing=True)
-                suppress_missing = len(invoice_records) == 0
-        for ref in rule.refs:
-            rrefs, rrecs, rvalid = _gather(ref, rule.value_kind, include_missing=not suppress_missing)
-            all_refs.extend(rrefs)
-            if rvalid:
-                has_any_valid = True
-            for rec in rrecs:
-                groups.setdefault(rec.normalized, []).append(rec)
-
-        merged_refs = _dedupe(all_refs)
+                suppress_missing = len(context.collect(invoice_ref, value_kind).records) == 0
+        all_records = [rec for ref in rule.refs for rec in context.collect(ref, value_kind).records]
+
+        # Refs are only rendered when a message is emitted; most rules settle without one.
+        def _all_refs() -> Iterable[Dict[str, Any]]:
+            return chain.from_iterable(
+                context.collection_refs(ref, value_kind, include_missing=not suppress_missing)
+                for ref in rule.refs
+            )
 
-        if not has_any_valid or len(groups) == 0:
+        if not all_records:
             if not suppress_missing:
-                validations.append(
+                messages.append(
                     ValidationMessage(
                         rule_id=f"{rule.rule_id}_availability",
                         severity=ValidationSeverity.WARN,
                         message=f"{rule.description}: отсутствуют или некорректны данные для сравнения",
-                        refs=merged_refs,
+                        refs=_dedupe_refs(_all_refs()),
                     )
                 )
-            continue
-
-        if len(groups) > 1:
+            return messages
+
+        # Most groups agree; only group records by value once a differing one shows up.
+        first_value = all_records[0].normalized
+        if any(rec.normalized != first_value for rec in all_records):
+            groups: Dict[Any, List[FieldValueRecord]] = defaultdict(list)
+            for rec in all_records:
+                groups[rec.normalized].append(rec)
             if suppress_missing:
                 total = sum(len(records) for records in groups.values())
                 majority_value = None
@@ -1864,8 +1988,8 @@ def _apply_group_equality_rules(
                             continue
                         for rec in records:
                             outlier_refs.append(_ref_from_field(rec.document, rec.field, normalized=rec.normalized))
-                    combined_refs = _dedupe(all_refs + outlier_refs)
-                    validations.append(
+                    combined_refs = _dedupe_refs(chain(_all_refs(), outlier_refs))
+                    messages.append(
                         ValidationMessage(
                             rule_id=rule.rule_id,
                             severity=rule.severity,
@@ -1873,48 +1997,40 @@ def _apply_group_equality_rules(
                             refs=combined_refs,
                         )
                     )
-                    continue
-            validations.append(
+                    return messages
+            messages.append(
                 ValidationMessage(
                     rule_id=rule.rule_id,
                     severity=rule.severity,
                     message=f"{rule.description}: values are not equal across documents",
-                    refs=merged_refs,
+                    refs=_dedupe_refs(_all_refs()),
                 )
             )
-            continue
+            return messages
 
-        total_valid = sum(len(records) for records in groups.values())
-        if total_valid >= 2:
-            validations.append(
+        if len(all_records) >= 2:
+            messages.append(
                 ValidationMessage(
                     rule_id=rule.rule_id,
                     severity=ValidationSeverity.OK,
                     message=rule.description,
-                    refs=merged_refs,
+                    refs=_dedupe_refs(_all_refs()),
                 )
             )
+        return messages
+
+    filtered_rules = _active_group_equality_rules(frozenset(active_doc_type_values))
+    validations.extend(chain.from_iterable(_run_rules(_apply_rule, filtered_rules)))
 
 
 # --- Legacy helpers and validations (to be refactored into new rule engine) ---
 
 def _collect_fields(rows: Iterable[FilledField]) -> Dict[uuid.UUID, Dict[str, FilledField]]:
-    result: Dict[uuid.UUID, Dict[str, FilledField]] = {}
+    result: Dict[uuid.UUID, Dict[str, FilledField]] = defaultdict(dict)
     for field in rows:
-        result.setdefault(field.doc_id, {})[field.field_key] = field
-    return result
-
-
-def _parse_number(value: Optional[str]) -> Optional[float]:
-    if not value:
-        return None
-    match = re.search(r"([0-9]+(?:\.[0-9]+)?)", value.replace(" ", ""))
-    if not match:
-        return None
-    try:
-        return float(match.group(1))
-    except ValueError:
-        return None
+        # Interned keys let lookups with rule field keys match on identity.
+        result[field.doc_id][sys.intern(field.field_key)] = field
+    return dict(result)
 
 
 def _collect_value(field: Optional[FilledField]) -> Optional[str]:
@@ -1927,41 +2043,73 @@ def _matrix_values_equal(anchor_value: str, other_value: str) -> bool:
     return anchor_value.casefold() == other_value.casefold()
 
 
+_STATUS_PRIORITY: Dict[Optional[str], int] = {"anchor": 4, "mismatch": 3, "missing": 2, "match": 1, None: 0}
+
+
+def _merge_status(current: Optional[str], new: Optional[str]) -> Optional[str]:
+    if new is None:
+        return current
+    if _STATUS_PRIORITY.get(new, 0) >= _STATUS_PRIORITY.get(current, 0):
+        return new
+    return current
+
+
+def _matrix_value_table(
+    documents: List[Document],
+    fields_by_doc: Dict[uuid.UUID, Dict[str, FilledField]],
+) -> Dict[Tuple[str, str], Tuple[int, str]]:
+    """Map (doc type value, field key) to the position and value of the first document carrying it."""
+    table: Dict[Tuple[str, str], Tuple[int, str]] = {}
+    doc_type_values: Dict[Any, str] = {}
+    for position, document in enumerate(documents):
+        doc_type = document.doc_type
+        doc_type_value = doc_type_values.get(doc_type)
+        if doc_type_value is None:
+            doc_type_value = doc_type_values[doc_type] = getattr(doc_type, "value", str(doc_type))
+        for key, field in fields_by_doc.get(document.id, {}).items():
+            if isinstance(field, FilledField):
+                table.setdefault((doc_type_value, key), (position, field.value or ""))
+    return table
+
+
+def _matrix_field_value(
+    table: Dict[Tuple[str, str], Tuple[int, str]], doc_type: str, aliases: List[str]
+) -> Tuple[str, bool]:
+    # The first document of the type holding any alias decides; prefer its first non-empty alias.
+    hits = [table[(doc_type, alias)] for alias in aliases if (doc_type, alias) in table]
+    if not hits:
+        return "", False
+    first_position = min(position for position, _ in hits)
+    for position, value in hits:
+        if position == first_position and value:
+            return value, True
+    return "", True
+
+
 def _build_field_matrix_snapshot(
     documents: List[Document],
     fields_by_doc: Dict[uuid.UUID, Dict[str, FilledField]],
     document_profile: str,
+    value_table: Optional[Dict[Tuple[str, str], Tuple[int, str]]] = None,
 ) -> Dict[str, Any]:
     field_matrix_doc_types, field_matrix_doc_type_map = _field_matrix_config(document_profile)
     field_comparison_rules = _filtered_field_comparison_rules(get_active_document_type_values(document_profile))
-    doc_type_lookup: Dict[str, List[Dict[str, FilledField]]] = {}
-    for document in documents:
-        doc_type_value = getattr(document.doc_type, "value", str(document.doc_type))
-        doc_fields = fields_by_doc.get(document.id, {})
-        doc_type_lookup.setdefault(doc_type_value, []).append(doc_fields)
+    if value_table is None:
+        value_table = _matrix_value_table(documents, fields_by_doc)
+    # Columns whose doc type has no fields in this batch render empty without any lookups.
+    populated_doc_types = {doc_type for doc_type, _ in value_table}
+    display_columns = [
+        (display_doc, field_matrix_doc_type_map.get(display_doc, display_doc))
+        for display_doc in field_matrix_doc_types
+    ]
+    actual_to_display = {
+        actual_doc_type: display_doc
+        for display_doc, actual_doc_type in display_columns
+        if actual_doc_type
+    }
 
     def _get_field_value(doc_type: str, aliases: List[str]) -> Tuple[str, bool]:
-        found = False
-        value = ""
-        for field_set in doc_type_lookup.get(doc_type, []):
-            for alias in aliases:
-                field = field_set.get(alias)
-                if field and isinstance(field, FilledField):
-                    value = field.value or ""
-                    found = True
-                    if value:
-                        return value, True
-            if found:
-                return value, True
-        return "", False
-
-    def _merge_status(current: Optional[str], new: Optional[str]) -> Optional[str]:
-        if new is None:
-            return current
-        priority = {"anchor": 4, "mismatch": 3, "missing": 2, "match": 1, None: 0}
-        if priority.get(new, 0) >= priority.get(current, 0):
-            return new
-        return current
+        return _matrix_field_value(value_table, doc_type, aliases)
 
     def _get_mapped_value(doc_type: str, mapping: Dict[str, List[str]]) -> str:
         aliases = mapping.get(doc_type) or []
@@ -1978,10 +2126,9 @@ def _build_field_matrix_snapshot(
     ):
         row: Dict[str, Any] = {"FieldKey": label}
         statuses: Dict[str, Optional[str]] = {doc: None for doc in field_matrix_doc_types}
-        for display_doc in field_matrix_doc_types:
-            actual_doc_type = field_matrix_doc_type_map.get(display_doc, display_doc)
+        for display_doc, actual_doc_type in display_columns:
             value = ""
-            if actual_doc_type:
+            if actual_doc_type in populated_doc_types:
                 value = _get_mapped_value(actual_doc_type, mapping)
             row[display_doc] = value
         row["statuses"] = statuses
@@ -1991,16 +2138,14 @@ def _build_field_matrix_snapshot(
         row: Dict[str, Any] = {"FieldKey": field_key}
         statuses: Dict[str, Optional[str]] = {doc: None for doc in field_matrix_doc_types}
         value_cache: Dict[str, Tuple[str, bool]] = {}
-        actual_to_display: Dict[str, str] = {}
 
-        for display_doc in field_matrix_doc_types:
-            actual_doc_type = field_matrix_doc_type_map.get(display_doc, display_doc)
+        for display_doc, actual_doc_type in display_columns:
             value = ""
             present = False
             if actual_doc_type:
-                value, present = _get_field_value(actual_doc_type, aliases)
+                if actual_doc_type in populated_doc_types:
+                    value, present = _get_field_value(actual_doc_type, aliases)
                 value_cache[actual_doc_type] = (value, present)
-                actual_to_display[actual_doc_type] = display_doc
             row[display_doc] = value or ""
 
         for rule in field_comparison_rules.get(field_key, []):
@@ -2069,29 +2214,26 @@ def _build_field_matrix_diff_snapshot(
     documents: List[Document],
     fields_by_doc: Dict[uuid.UUID, Dict[str, FilledField]],
     document_profile: str,
+    value_table: Optional[Dict[Tuple[str, str], Tuple[int, str]]] = None,
 ) -> Dict[str, Any]:
     field_matrix_doc_types, field_matrix_doc_type_map = _field_matrix_config(document_profile)
     field_comparison_rules = _filtered_field_comparison_rules(get_active_document_type_values(document_profile))
-    doc_type_lookup: Dict[str, List[Dict[str, FilledField]]] = {}
-    for document in documents:
-        doc_type_value = getattr(document.doc_type, "value", str(document.doc_type))
-        doc_fields = fields_by_doc.get(document.id, {})
-        doc_type_lookup.setdefault(doc_type_value, []).append(doc_fields)
+    if value_table is None:
+        value_table = _matrix_value_table(documents, fields_by_doc)
+    # Columns whose doc type has no fields in this batch render empty without any lookups.
+    populated_doc_types = {doc_type for doc_type, _ in value_table}
+    display_columns = [
+        (display_doc, field_matrix_doc_type_map.get(display_doc, display_doc))
+        for display_doc in field_matrix_doc_types
+    ]
+    actual_to_display = {
+        actual_doc_type: display_doc
+        for display_doc, actual_doc_type in display_columns
+        if actual_doc_type
+    }
 
     def _get_field_value(doc_type: str, aliases: List[str]) -> Tuple[str, bool]:
-        found = False
-        value = ""
-        for field_set in doc_type_lookup.get(doc_type, []):
-            for alias in aliases:
-                field = field_set.get(alias)
-                if field and isinstance(field, FilledField):
-                    value = field.value or ""
-                    found = True
-                    if value:
-                        return value, True
-            if found:
-                return value, True
-        return "", False
+        return _matrix_field_value(value_table, doc_type, aliases)
 
     def _get_mapped_value(doc_type: str, mapping: Dict[str, List[str]]) -> str:
         aliases = mapping.get(doc_type) or []
@@ -2100,14 +2242,6 @@ def _build_field_matrix_diff_snapshot(
         value, _ = _get_field_value(doc_type, aliases)
         return value or ""
 
-    def _merge_status(current: Optional[str], new: Optional[str]) -> Optional[str]:
-        if new is None:
-            return current
-        priority = {"anchor": 4, "mismatch": 3, "missing": 2, "match": 1, None: 0}
-        if priority.get(new, 0) >= priority.get(current, 0):
-            return new
-        return current
-
     rows: List[Dict[str, Any]] = []
 
     for label, mapping in (
@@ -2116,10 +2250,9 @@ def _build_field_matrix_diff_snapshot(
     ):
         row: Dict[str, Any] = {"FieldKey": label}
         statuses: Dict[str, Optional[str]] = {doc: None for doc in field_matrix_doc_types}
-        for display_doc in field_matrix_doc_types:
-            actual_doc_type = field_matrix_doc_type_map.get(display_doc, display_doc)
+        for display_doc, actual_doc_type in display_columns:
             value = ""
-            if actual_doc_type:
+            if actual_doc_type in populated_doc_types:
                 value = _get_mapped_value(actual_doc_type, mapping)
             row[display_doc] = value
         row["statuses"] = statuses
@@ -2129,16 +2262,14 @@ def _build_field_matrix_diff_snapshot(
         row = {"FieldKey": field_key}
         statuses: Dict[str, Optional[str]] = {doc: None for doc in field_matrix_doc_types}
         value_cache: Dict[str, Tuple[str, bool]] = {}
-        actual_to_display: Dict[str, str] = {}
 
-        for display_doc in field_matrix_doc_types:
-            actual_doc_type = field_matrix_doc_type_map.get(display_doc, display_doc)
+        for display_doc, actual_doc_type in display_columns:
             value = ""
             present = False
             if actual_doc_type:
-                value, present = _get_field_value(actual_doc_type, aliases)
+                if actual_doc_type in populated_doc_types:
+                    value, present = _get_field_value(actual_doc_type, aliases)
                 value_cache[actual_doc_type] = (value, present)
-                actual_to_display[actual_doc_type] = display_doc
             row[display_doc] = value or ""
 
         for rule in field_comparison_rules.get(field_key, []):
@@ -2172,15 +2303,29 @@ def _build_field_matrix_diff_snapshot(
     return {"documents": field_matrix_doc_types, "rows": rows}
 
 
-async def fetch_latest_fields(session: AsyncSession, batch_id: uuid.UUID) -> Dict[uuid.UUID, Dict[str, FilledField]]:
+@lru_cache(maxsize=None)
+def _required_keys(doc_type: DocumentType) -> Tuple[str, ...]:
+    # Only required keys are checked, and most document types have none.
+    return tuple(get_schema(doc_type).required_keys)
+
+
+async def fetch_latest_fields(
+    session: AsyncSession, batch_id: uuid.UUID
+) -> Tuple[List[Document], Dict[uuid.UUID, Dict[str, FilledField]]]:
+    """Load the batch documents together with their latest fields in one round-trip."""
     stmt = (
-        select(FilledField)
-        .join(Document)
-        .where(Document.batch_id == batch_id, FilledField.latest.is_(True))
+        select(Document, FilledField)
+        .outerjoin(FilledField, and_(FilledField.doc_id == Document.id, FilledField.latest.is_(True)))
+        .where(Document.batch_id == batch_id)
     )
     result = await session.execute(stmt)
-    fields = result.scalars().all()
-    return _collect_fields(fields)
+    documents: Dict[uuid.UUID, Document] = {}
+    fields: List[FilledField] = []
+    for document, field in result.tuples():
+        documents.setdefault(document.id, document)
+        if field is not None:
+            fields.append(field)
+    return list(documents.values()), _collect_fields(fields)
 
 
 async def validate_batch(session: AsyncSession, batch_id: uuid.UUID) -> List[ValidationMessage]:
@@ -2193,10 +2338,7 @@ async def validate_batch(session: AsyncSession, batch_id: uuid.UUID) -> List[Val
     document_profile = get_document_profile(batch.meta)
     active_document_types = get_active_document_types(document_profile)
     active_doc_type_values = get_active_document_type_values(document_profile)
-    fields_by_doc = await fetch_latest_fields(session, batch_id)
-    doc_stmt = select(Document).where(Document.batch_id == batch_id)
-    docs_result = await session.execute(doc_stmt)
-    all_documents = docs_result.scalars().all()
+    all_documents, fields_by_doc = await fetch_latest_fields(session, batch_id)
     alternative_doc_ids = document_versions.alternative_document_ids(batch.meta)
     documents = [
         document
@@ -2213,31 +2355,41 @@ async def validate_batch(session: AsyncSession, batch_id: uuid.UUID) -> List[Val
     validations: List[ValidationMessage] = []
     required_fields_failed = False
     required_field_refs: List[Dict[str, Any]] = []
+    emit = validations.append
+    add_required_ref = required_field_refs.append
 
     for document in documents:
-        schema = get_schema(document.doc_type)
+        required_keys = _required_keys(document.doc_type)
+        if not required_keys:
+            continue
         doc_fields = fields_by_doc.get(document.id, {})
-        for key, field_schema in schema.fields.items():
+        for key in required_keys:
             field = doc_fields.get(key)
-            if not field_schema.required:
-                continue
             if field is None or (field.value in (None, "")):
                 required_fields_failed = True
-                note = "missing_required" if field is None else "empty_required"
-                refs = [
-                    _build_ref(
+                if field is None:
+                    ref = _build_ref(
                         doc_id=document.id,
                         field_key=key,
-                        value=(field.value if field else None),
+                        value=None,
                         normalized=None,
-                        present=bool(field),
-                        page=(getattr(field, "page", None) if field else None),
-                        bbox=(getattr(field, "bbox", None) if field else None),
-                        token_refs=(getattr(field, "token_refs", None) if field else None),
-                        note=note,
+                        present=False,
+                        note="missing_required",
                     )
-                ]
-                validations.append(
+                else:
+                    ref = _build_ref(
+                        doc_id=document.id,
+                        field_key=key,
+                        value=field.value,
+                        normalized=None,
+                        present=True,
+                        page=field.page,
+                        bbox=field.bbox,
+                        token_refs=field.token_refs,
+                        note="empty_required",
+                    )
+                refs = [ref]
+                emit(
                     ValidationMessage(
                         rule_id="required_fields",
                         severity=ValidationSeverity.ERROR,
@@ -2246,16 +2398,16 @@ async def validate_batch(session: AsyncSession, batch_id: uuid.UUID) -> List[Val
                     )
                 )
             else:
-                required_field_refs.append(
+                add_required_ref(
                     _build_ref(
                         doc_id=document.id,
                         field_key=key,
                         value=field.value,
                         normalized=None,
                         present=True,
-                        page=getattr(field, "page", None),
-                        bbox=getattr(field, "bbox", None),
-                        token_refs=getattr(field, "token_refs", None),
+                        page=field.page,
+                        bbox=field.bbox,
+                        token_refs=field.token_refs,
                     )
                 )
     if not required_fields_failed:
@@ -2297,165 +2449,164 @@ async def validate_batch(session: AsyncSession, batch_id: uuid.UUID) -> List[Val
             )
         )
 
-    context = ValidationContext(documents, fields_by_doc)
+    rule_refs = _ALL_REFS.union(ref for rule in dynamic_date_rules[len(DATE_RULES):] for ref in _rule_refs(rule))
+    context = ValidationContext(documents, fields_by_doc, rule_refs)
     _apply_date_rules(context, validations, active_doc_type_values, dynamic_date_rules)
     _apply_anchored_equality_rules(context, validations, active_doc_type_values)
     _apply_group_equality_rules(context, validations, active_doc_type_values)
 
-    invoice_numbers = {
-        doc_id: _collect_value(fields.get("invoice_no"))
-        for doc_id, fields in fields_by_doc.items()
-        if "invoice_no" in fields
-    }
-    unique_invoices = {value for value in invoice_numbers.values() if value}
+    # Collect the cross-document header values and their refs in a single pass over the fields.
+    unique_invoices: set[str] = set()
+    invoice_refs: List[Dict[str, Any]] = []
+    unique_currency: set[str] = set()
+    currency_refs: List[Dict[str, Any]] = []
+    destination_values: set[str] = set()
+    destination_refs: List[Dict[str, Any]] = []
+    for doc_id, fields in fields_by_doc.items():
+        invoice_field = fields.get("invoice_no")
+        if invoice_field is not None:
+            value = _collect_value(invoice_field)
+            if value:
+                unique_invoices.add(value)
+            invoice_refs.append({"doc_id": doc_id, "field_key": "invoice_no", "value": value})
+        currency_field = fields.get("currency")
+        if currency_field is not None:
+            value = _collect_value(currency_field)
+            if value:
+                unique_currency.add(value)
+                currency_refs.append({"doc_id": doc_id, "field_key": "currency", "value": value})
+        for field_key in ("destination", "port_of_discharge"):
+            destination_field = fields.get(field_key)
+            if destination_field is not None and destination_field.value:
+                destination_values.add(destination_field.value.strip().upper())
+                destination_refs.append(
+                    {"doc_id": doc_id, "field_key": field_key, "value": destination_field.value}
+                )
+
     if len(unique_invoices) > 1:
-        refs = [
-            {"doc_id": doc_id, "field_key": "invoice_no", "value": value}
-            for doc_id, value in invoice_numbers.items()
-        ]
         validations.append(
             ValidationMessage(
                 rule_id="invoice_no_alignment",
                 severity=ValidationSeverity.ERROR,
                 message="Invoice numbers do not match across documents",
-                refs=refs,
+                refs=invoice_refs,
             )
         )
     else:
-        refs = [
-            {"doc_id": doc_id, "field_key": "invoice_no", "value": value}
-            for doc_id, value in invoice_numbers.items()
-        ]
         validations.append(
             ValidationMessage(
                 rule_id="invoice_no_alignment",
                 severity=ValidationSeverity.OK,
                 message="Invoice numbers match across documents",
-                refs=refs,
+                refs=invoice_refs,
             )
         )
 
     # Global weight consistency check disabled; relying on per-product comparisons
-    currency_values = {
-        doc_id: _collect_value(fields.get("currency"))
-        for doc_id, fields in fields_by_doc.items()
-        if "currency" in fields
-    }
-    unique_currency = {value for value in currency_values.values() if value}
     if len(unique_currency) > 1:
-        refs = [
-            {"doc_id": doc_id, "field_key": "currency", "value": value}
-            for doc_id, value in currency_values.items()
-            if value
-        ]
         validations.append(
             ValidationMessage(
                 rule_id="currency_consistency",
                 severity=ValidationSeverity.WARN,
                 message="Currency values differ across documents",
-                refs=refs,
+                refs=currency_refs,
             )
         )
     else:
-        refs = [
-            {"doc_id": doc_id, "field_key": "currency", "value": value}
-            for doc_id, value in currency_values.items()
-            if value
-        ]
         validations.append(
             ValidationMessage(
                 rule_id="currency_consistency",
                 severity=ValidationSeverity.OK,
                 message="Currency values match across documents",
-                refs=refs,
+                refs=currency_refs,
             )
         )
 
-    # Products comparison across documents
-    rows_by_doc: Dict[uuid.UUID, List[Dict[str, Optional[str]]]] = {}
-    for document in documents:
-        doc_fields = fields_by_doc.get(document.id, {})
-        rows_by_doc[document.id] = _collect_product_rows_for_doc(doc_fields)
-
-    anchor_doc = _prefer_anchor(documents, rows_by_doc)
-    if anchor_doc is not None:
+    # Products comparison across documents; a lone document has nothing to be compared with.
+    if len(documents) > 1:
+        rows_by_doc: Dict[uuid.UUID, List[Dict[str, Optional[str]]]] = {}
         for document in documents:
-            if document.id == anchor_doc.id:
-                continue
-            _compare_products(anchor_doc, document, rows_by_doc, validations)
+            doc_fields = fields_by_doc.get(document.id)
+            rows_by_doc[document.id] = _collect_product_rows_for_doc(doc_fields) if doc_fields else []
+
+        anchor_doc = _prefer_anchor(documents, rows_by_doc)
+        if anchor_doc is not None:
+            # The anchor's multiset is shared by every comparison, so build it once.
+            anchor_products = _build_product_multiset(rows_by_doc[anchor_doc.id])
+            for document in documents:
+                if document.id == anchor_doc.id:
+                    continue
+                target_products = _build_product_multiset(rows_by_doc[document.id])
+                _compare_products(anchor_doc, document, anchor_products, target_products, validations)
 
-    destinations = []
-    for doc_id, fields in fields_by_doc.items():
-        if "destination" in fields:
-            destinations.append((doc_id, "destination", fields["destination"].value))
-        if "port_of_discharge" in fields:
-            destinations.append((doc_id, "port_of_discharge", fields["port_of_discharge"].value))
-    destination_values = {value.strip().upper() for _, _, value in destinations if value}
     if len(destination_values) > 1:
-        refs = [
-            {"doc_id": doc_id, "field_key": field_key, "value": value}
-            for doc_id, field_key, value in destinations
-            if value
-        ]
         validations.append(
             ValidationMessage(
                 rule_id="destination_alignment",
                 severity=ValidationSeverity.WARN,
                 message="Destination or discharge ports differ between documents",
-                refs=refs,
+                refs=destination_refs,
             )
         )
     else:
-        refs = [
-            {"doc_id": doc_id, "field_key": field_key, "value": value}
-            for doc_id, field_key, value in destinations
-            if value
-        ]
         validations.append(
             ValidationMessage(
                 rule_id="destination_alignment",
                 severity=ValidationSeverity.OK,
                 message="Destination and discharge ports match between documents",
-                refs=refs,
+                refs=destination_refs,
             )
         )
 
-    field_matrix = _build_field_matrix_snapshot(documents, fields_by_doc, document_profile)
+    matrix_values = _matrix_value_table(documents, fields_by_doc)
+    field_matrix = _build_field_matrix_snapshot(documents, fields_by_doc, document_profile, matrix_values)
     validations.append(
         ValidationMessage(
             rule_id="document_matrix",
             severity=ValidationSeverity.OK,
             message="Document field matrix snapshot",
             refs=[field_matrix],
+            refs_json_safe=True,
         )
     )
-    field_matrix_diff = _build_field_matrix_diff_snapshot(documents, fields_by_doc, document_profile)
+    field_matrix_diff = _build_field_matrix_diff_snapshot(
+        documents, fields_by_doc, document_profile, matrix_values
+    )
     validations.append(
         ValidationMessage(
             rule_id="document_matrix_diff",
             severity=ValidationSeverity.OK,
             message="Document field matrix diff snapshot",
             refs=[field_matrix_diff],
+            refs_json_safe=True,
         )
     )
 
     return validations
 
 
+def _storable_refs(message: ValidationMessage) -> Optional[List[Dict[str, object]]]:
+    if not message.refs:
+        return None
+    if message.refs_json_safe:
+        return message.refs
+    return _json_safe(message.refs)
+
+
 async def store_validations(session: AsyncSession, batch_id: uuid.UUID, messages: List[ValidationMessage]) -> None:
     await session.execute(delete(Validation).where(Validation.batch_id == batch_id))
-    for message in messages:
-        serializable_refs = _json_safe(message.refs) if message.refs else None
-        session.add(
-            Validation(
-                batch_id=batch_id,
-                rule_id=message.rule_id,
-                severity=message.severity,
-                message=message.message,
-                refs=serializable_refs,
-            )
-        )
-    await session.flush()
+    rows = [
+        {
+            "batch_id": batch_id,
+            "rule_id": message.rule_id,
+            "severity": message.severity,
+            "message": message.message,
+            "refs": _storable_refs(message),
+        }
+        for message in messages
+    ]
+    if rows:
+        await session.execute(insert(Validation), rows)
 
 
 
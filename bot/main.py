@@ -4,18 +4,42 @@ import argparse
 import json
 import os
 import shutil
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.util.retry import Retry
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
 
-TELEGRAM_BOT_TOKEN_OVERRIDE = "8576804170:AAFPr5Tzjpe9mzSgBu8WgxkJQr_O_gPeqwM"
-TELEGRAM_CHAT_ID_OVERRIDE = "-5216421758"
 FEEDBACK_TYPE_LABELS = {
     "problem": "Проблема",
     "improvement": "Предложение по улучшению",
 }
+# Drained tickets share one text message within Telegram's limits; photos go out per ticket.
+TICKETS_PER_MESSAGE = 5
+TELEGRAM_MESSAGE_LIMIT = 4096
+TICKET_SEPARATOR = "\n\n" + "-" * 20 + "\n\n"
+# Pause after a filesystem event so a ticket's payload and attachments land in one drain.
+WATCH_DEBOUNCE_SECONDS = 0.5
+# Every ticket goes to one group chat, where Telegram allows about 20 messages per minute.
+TELEGRAM_MIN_CALL_INTERVAL = 3.0
+# Attempts per API call when Telegram answers 429 Too Many Requests.
+TELEGRAM_MAX_ATTEMPTS = 3
+
+_telegram_next_call = 0.0
+
+# Shared keep-alive session so repeated calls skip the TCP/TLS handshake to api.telegram.org.
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.3)),
+)
 
 
 def _get_env(*names: str) -> Optional[str]:
@@ -60,60 +84,109 @@ def _format_message(payload: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def _throttle_telegram() -> None:
+    global _telegram_next_call
+    now = time.monotonic()
+    delay = _telegram_next_call - now
+    _telegram_next_call = max(now, _telegram_next_call) + TELEGRAM_MIN_CALL_INTERVAL
+    if delay > 0:
+        time.sleep(delay)
+
+
+def _retry_after(response: requests.Response) -> float:
+    try:
+        return float(response.json().get("parameters", {}).get("retry_after", 1))
+    except (ValueError, AttributeError, TypeError):
+        return 1.0
+
+
+def _post_telegram(token: str, method: str, build_request: Callable[[], Dict[str, Any]]) -> bool:
+    """POST a bot API call, waiting out 429 responses for as long as Telegram asks."""
+    global _telegram_next_call
+    url = f"https://api.telegram.org/bot{token}/{method}"
+    for _ in range(TELEGRAM_MAX_ATTEMPTS):
+        _throttle_telegram()
+        response = _SESSION.post(url, **build_request())
+        if response.status_code == 429:
+            _telegram_next_call = max(_telegram_next_call, time.monotonic() + _retry_after(response))
+            continue
+        if response.status_code != 200:
+            return False
+        payload = response.json()
+        return bool(payload.get("ok"))
+    return False
+
+
 def _send_message(token: str, chat_id: str, text: str) -> bool:
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    response = requests.post(
-        url,
-        data={
-            "chat_id": chat_id,
-            "text": text,
-            "disable_web_page_preview": True,
+    return _post_telegram(
+        token,
+        "sendMessage",
+        lambda: {
+            "data": {
+                "chat_id": chat_id,
+                "text": text,
+                "disable_web_page_preview": True,
+            },
+            "timeout": 10,
         },
-        timeout=10,
     )
-    if response.status_code != 200:
-        return False
-    payload = response.json()
-    return bool(payload.get("ok"))
 
 
-def _send_media_group(token: str, chat_id: str, files: List[Path]) -> bool:
+def _send_media_group(token: str, chat_id: str, files: List[Path], caption: Optional[str] = None) -> bool:
     if not files:
         return True
-    url = f"https://api.telegram.org/bot{token}/sendMediaGroup"
     media = []
     handles = []
     file_payload: List[Tuple[str, Tuple[str, Any, str]]] = []
     try:
         for index, path in enumerate(files):
             attach_name = f"file{index}"
-            media.append({"type": "photo", "media": f"attach://{attach_name}"})
+            item = {"type": "photo", "media": f"attach://{attach_name}"}
+            if caption and index == 0:
+                item["caption"] = caption
+            media.append(item)
             handle = path.open("rb")
             handles.append(handle)
             file_payload.append((attach_name, (path.name, handle, "application/octet-stream")))
-        response = requests.post(
-            url,
-            data={
-                "chat_id": chat_id,
-                "media": json.dumps(media, ensure_ascii=False),
-            },
-            files=file_payload,
-            timeout=20,
-        )
+
+        def build_request() -> Dict[str, Any]:
+            # A retry re-reads the photos, so rewind the handles and build a fresh encoder.
+            for handle in handles:
+                handle.seek(0)
+            # Stream the multipart body from the open handles instead of buffering every photo in memory.
+            encoder = MultipartEncoder(
+                fields=[
+                    ("chat_id", chat_id),
+                    ("media", json.dumps(media, ensure_ascii=False)),
+                    *file_payload,
+                ]
+            )
+            return {"data": encoder, "headers": {"Content-Type": encoder.content_type}, "timeout": 20}
+
+        return _post_telegram(token, "sendMediaGroup", build_request)
     finally:
         for handle in handles:
             handle.close()
-    if response.status_code != 200:
-        return False
-    payload = response.json()
-    return bool(payload.get("ok"))
 
 
-def _send_payload(payload: Dict[str, Any], files_dir: Path) -> bool:
-    token = TELEGRAM_BOT_TOKEN_OVERRIDE or _get_env("SUPPLYHUB_TELEGRAM_BOT_TOKEN", "TELEGRAM_BOT_TOKEN")
-    chat_id = TELEGRAM_CHAT_ID_OVERRIDE or _get_env("SUPPLYHUB_TELEGRAM_CHAT_ID", "TELEGRAM_CHAT_ID")
+class PendingTicket(NamedTuple):
+    ticket_dir: Path
+    ticket_id: str
+    text: str
+    files: List[Path]
+
+
+@lru_cache(maxsize=1)
+def _telegram_credentials() -> Tuple[str, str]:
+    # Resolved on first send and reused; a missing value raises and is retried next time.
+    token = _get_env("SUPPLYHUB_TELEGRAM_BOT_TOKEN", "TELEGRAM_BOT_TOKEN")
+    chat_id = _get_env("SUPPLYHUB_TELEGRAM_CHAT_ID", "TELEGRAM_CHAT_ID")
     if not token or not chat_id:
         raise RuntimeError("Missing TELEGRAM_BOT_TOKEN or TELEGRAM_CHAT_ID")
+    return token, chat_id
+
+
+def _ticket_files(payload: Dict[str, Any], files_dir: Path) -> List[Path]:
     files = []
     for info in payload.get("files", []):
         stored_name = info.get("stored_name")
@@ -122,6 +195,12 @@ def _send_payload(payload: Dict[str, Any], files_dir: Path) -> bool:
         candidate = files_dir / stored_name
         if candidate.exists():
             files.append(candidate)
+    return files
+
+
+def _send_payload(payload: Dict[str, Any], files_dir: Path) -> bool:
+    token, chat_id = _telegram_credentials()
+    files = _ticket_files(payload, files_dir)
     message = _format_message(payload)
     if not _send_message(token, chat_id, message):
         return False
@@ -133,36 +212,136 @@ def _load_payload(ticket_dir: Path) -> Dict[str, Any]:
     return json.loads(payload_path.read_text(encoding="utf-8"))
 
 
+def _batch_tickets(tickets: List[PendingTicket]) -> List[List[PendingTicket]]:
+    batches: List[List[PendingTicket]] = []
+    current: List[PendingTicket] = []
+    text_length = 0
+    for ticket in tickets:
+        added_length = len(ticket.text) + (len(TICKET_SEPARATOR) if current else 0)
+        if current and (len(current) >= TICKETS_PER_MESSAGE or text_length + added_length > TELEGRAM_MESSAGE_LIMIT):
+            batches.append(current)
+            current = []
+            text_length = 0
+            added_length = len(ticket.text)
+        current.append(ticket)
+        text_length += added_length
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _send_ticket_files(token: str, chat_id: str, ticket: PendingTicket) -> bool:
+    # Each ticket gets its own album, captioned so the photos can be matched to their text.
+    try:
+        return _send_media_group(token, chat_id, ticket.files, caption=f"Feedback #{ticket.ticket_id}")
+    except Exception as exc:
+        print(f"Failed to send {ticket.ticket_dir.name}: {exc}")
+        return False
+
+
+def _send_ticket_batch(batch: List[PendingTicket]) -> List[Path]:
+    """Send a batch of tickets and return the directories of the tickets that were delivered."""
+    token, chat_id = _telegram_credentials()
+    if len(batch) > 1:
+        text = TICKET_SEPARATOR.join(ticket.text for ticket in batch)
+        try:
+            combined_sent = _send_message(token, chat_id, text)
+        except Exception as exc:
+            print(f"Batched send failed: {exc}")
+            combined_sent = False
+        if combined_sent:
+            # The texts are already posted; never resend them, only the albums remain.
+            return [ticket.ticket_dir for ticket in batch if _send_ticket_files(token, chat_id, ticket)]
+        # Fall back to one ticket at a time so a single bad ticket doesn't hold back the rest.
+    sent: List[Path] = []
+    for ticket in batch:
+        try:
+            delivered = _send_message(token, chat_id, ticket.text)
+        except Exception as exc:
+            print(f"Failed to send {ticket.ticket_dir.name}: {exc}")
+            continue
+        if delivered and _send_ticket_files(token, chat_id, ticket):
+            sent.append(ticket.ticket_dir)
+    return sent
+
+
 def _drain_pending(feedback_root: Path) -> int:
     pending_root = feedback_root / "pending"
     if not pending_root.exists():
         return 0
-    sent_count = 0
+    tickets: List[PendingTicket] = []
     for ticket_dir in sorted(pending_root.iterdir()):
         if not ticket_dir.is_dir():
             continue
         try:
             payload = _load_payload(ticket_dir)
-            files_dir = ticket_dir / "files"
-            if _send_payload(payload, files_dir):
-                shutil.rmtree(ticket_dir, ignore_errors=True)
-                sent_count += 1
         except Exception as exc:
             print(f"Failed to send {ticket_dir.name}: {exc}")
+            continue
+        tickets.append(
+            PendingTicket(
+                ticket_dir,
+                str(payload.get("ticket_id") or ticket_dir.name),
+                _format_message(payload),
+                _ticket_files(payload, ticket_dir / "files"),
+            )
+        )
+    if not tickets:
+        return 0
+    sent_count = 0
+    # All tickets go to one chat: send serially so each text stays next to its photos, in sorted order.
+    for batch in _batch_tickets(tickets):
+        try:
+            sent_dirs = _send_ticket_batch(batch)
+        except Exception as exc:
+            names = ", ".join(ticket.ticket_dir.name for ticket in batch)
+            print(f"Failed to send {names}: {exc}")
+            continue
+        for ticket_dir in sent_dirs:
+            shutil.rmtree(ticket_dir, ignore_errors=True)
+        sent_count += len(sent_dirs)
     return sent_count
 
 
+class _PendingEventHandler(FileSystemEventHandler):
+    """Wake the watch loop when tickets are written into the pending directory."""
+
+    def __init__(self, wakeup: threading.Event) -> None:
+        self._wakeup = wakeup
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        if event.event_type not in ("created", "moved", "modified", "closed"):
+            return
+        if event.is_directory and event.event_type == "modified":
+            # Directory mtime changes also fire when sent tickets are removed.
+            return
+        self._wakeup.set()
+
+
 def _watch_pending(feedback_root: Path, interval: float) -> None:
     if interval < 2:
         interval = 2
-    while True:
-        try:
-            sent = _drain_pending(feedback_root)
-            if sent:
-                print(f"Sent {sent} feedback item(s).")
-        except Exception as exc:
-            print(f"Watch loop error: {exc}")
-        time.sleep(interval)
+    pending_root = feedback_root / "pending"
+    pending_root.mkdir(parents=True, exist_ok=True)
+    wakeup = threading.Event()
+    observer = Observer()
+    observer.schedule(_PendingEventHandler(wakeup), str(pending_root), recursive=True)
+    observer.start()
+    try:
+        while True:
+            wakeup.clear()
+            try:
+                sent = _drain_pending(feedback_root)
+                if sent:
+                    print(f"Sent {sent} feedback item(s).")
+            except Exception as exc:
+                print(f"Watch loop error: {exc}")
+            # The interval is only a fallback for missed events.
+            if wakeup.wait(interval):
+                time.sleep(WATCH_DEBOUNCE_SECONDS)
+    finally:
+        observer.stop()
+        observer.join()
 
 
 def main() -> None:
@@ -191,8 +370,8 @@ def main() -> None:
         "--interval",
         dest="interval",
         type=float,
-        default=10,
-        help="Polling interval in seconds (min 2)",
+        default=300,
+        help="Fallback polling interval in seconds when no file events arrive (min 2)",
     )
 
     args = parser.parse_args()
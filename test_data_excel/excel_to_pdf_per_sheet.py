@@ -7,14 +7,20 @@ in a temporary copy.
 from __future__ import annotations
 
 import os
+import queue
 import re
 import shutil
 import subprocess
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import openpyxl
 
+# Each conversion is a separate soffice process; a few can run side by side.
+MAX_PARALLEL_CONVERSIONS = 4
+
 
 def safe_filename(name: str) -> str:
     # Replace illegal filename chars
@@ -55,13 +61,17 @@ def find_soffice() -> str | None:
     return None
 
 
-def convert_sheet(excel_path: Path, sheet_name: str, output_dir: Path, soffice: str) -> Path:
+def write_sheet_copy(
+    wb: openpyxl.Workbook,
+    sheet_name: str,
+    output_dir: Path,
+    print_areas: dict[str, str],
+) -> Path:
     temp_path = output_dir / f"__temp__{safe_filename(sheet_name)}.xlsx"
-    wb = openpyxl.load_workbook(excel_path, read_only=False, data_only=False)
     if sheet_name not in wb.sheetnames:
-        wb.close()
         raise ValueError(f"Sheet not found: {sheet_name}")
 
+    # The workbook is shared between sheets, so every call sets the full state it relies on.
     # Move target sheet to the first position and make it active.
     sheet = wb[sheet_name]
     current_index = wb.sheetnames.index(sheet_name)
@@ -74,16 +84,26 @@ def convert_sheet(excel_path: Path, sheet_name: str, output_dir: Path, soffice:
         is_target = name == sheet_name
         ws.sheet_state = "visible" if is_target else "hidden"
         ws.sheet_view.tabSelected = is_target
-        if not is_target:
-            # Clear print ranges on other sheets; LibreOffice prints sheets with print areas
-            # even when they are hidden.
-            ws.print_area = None
+        # Clear print ranges on other sheets; LibreOffice prints sheets with print areas
+        # even when they are hidden. The target gets its original print area back.
+        ws.print_area = print_areas.get(name) if is_target else None
     wb.save(temp_path)
-    wb.close()
+    return temp_path
 
-    # Convert to PDF
+
+def export_sheet_pdf(temp_path: Path, sheet_name: str, output_dir: Path, soffice: str, profile_dir: Path) -> Path:
+    # A private user profile per concurrent soffice avoids LibreOffice's profile lock.
     subprocess.run(
-        [soffice, "--headless", "--convert-to", "pdf", "--outdir", str(output_dir), str(temp_path)],
+        [
+            soffice,
+            f"-env:UserInstallation={profile_dir.as_uri()}",
+            "--headless",
+            "--convert-to",
+            "pdf",
+            "--outdir",
+            str(output_dir),
+            str(temp_path),
+        ],
         check=True,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
@@ -115,14 +135,41 @@ def main() -> int:
     output_dir = excel_path.parent / "sheet_pdfs"
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    # Parse the workbook once; each sheet is exported from the same in-memory copy.
     wb = openpyxl.load_workbook(excel_path, read_only=False, data_only=False)
     sheet_names = [name for name in wb.sheetnames if wb[name].sheet_state == "visible"]
-    wb.close()
+    print_areas = {ws.title: ws.print_area for ws in wb.worksheets}
 
     print(f"Converting {len(sheet_names)} sheets from {excel_path.name}...")
-    for name in sheet_names:
-        pdf_path = convert_sheet(excel_path, name, output_dir, soffice)
-        print(f"- {name} -> {pdf_path.name}")
+    temp_paths: list[Path] = []
+    profile_root = Path(tempfile.mkdtemp(prefix="lo_profiles_"))
+    try:
+        try:
+            for name in sheet_names:
+                temp_paths.append(write_sheet_copy(wb, name, output_dir, print_areas))
+        finally:
+            wb.close()
+
+        workers = max(1, min(MAX_PARALLEL_CONVERSIONS, os.cpu_count() or 1, len(sheet_names)))
+        profiles: queue.Queue[Path] = queue.Queue()
+        for index in range(workers):
+            profiles.put(profile_root / f"profile_{index}")
+
+        def convert(name: str, temp_path: Path) -> Path:
+            profile_dir = profiles.get()
+            try:
+                return export_sheet_pdf(temp_path, name, output_dir, soffice, profile_dir)
+            finally:
+                profiles.put(profile_dir)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for name, pdf_path in zip(sheet_names, executor.map(convert, sheet_names, temp_paths)):
+                print(f"- {name} -> {pdf_path.name}")
+    finally:
+        shutil.rmtree(profile_root, ignore_errors=True)
+        # A failed sheet leaves its copy, and those of sheets not yet converted, behind.
+        for temp_path in temp_paths:
+            temp_path.unlink(missing_ok=True)
 
     print(f"Done. Output: {output_dir}")
     return 0
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("requests_toolbelt")
+pytest.importorskip("watchdog")
+
+from bot import main as bot
+
+
+def _ticket(name: str, text: str = "text", files: int = 0) -> bot.PendingTicket:
+    ticket_dir = Path("/pending") / name
+    return bot.PendingTicket(ticket_dir, name, text, [ticket_dir / "files" / f"{index}.jpg" for index in range(files)])
+
+
+def _stub_telegram(monkeypatch, *, message_ok, media_ok):
+    calls = []
+
+    def fake_send_message(token: str, chat_id: str, text: str) -> bool:
+        calls.append(("message", text))
+        return message_ok(text)
+
+    def fake_send_media_group(token: str, chat_id: str, files, caption=None) -> bool:
+        calls.append(("media", caption))
+        return media_ok(caption)
+
+    monkeypatch.setattr(bot, "_telegram_credentials", lambda: ("token", "chat"))
+    monkeypatch.setattr(bot, "_send_message", fake_send_message)
+    monkeypatch.setattr(bot, "_send_media_group", fake_send_media_group)
+    return calls
+
+
+def test_batch_tickets_respects_count_and_length_limits() -> None:
+    short = [_ticket(f"t{index}") for index in range(7)]
+    assert [len(batch) for batch in bot._batch_tickets(short)] == [bot.TICKETS_PER_MESSAGE, 2]
+
+    # Two texts fit exactly with the separator; a third one would overflow the message.
+    half = (bot.TELEGRAM_MESSAGE_LIMIT - len(bot.TICKET_SEPARATOR)) // 2
+    long = [_ticket("a", "a" * half), _ticket("b", "b" * half), _ticket("c", "c")]
+    batches = bot._batch_tickets(long)
+
+    assert [[ticket.ticket_id for ticket in batch] for batch in batches] == [["a", "b"], ["c"]]
+    assert all(
+        len(bot.TICKET_SEPARATOR.join(ticket.text for ticket in batch)) <= bot.TELEGRAM_MESSAGE_LIMIT
+        for batch in batches
+    )
+
+
+def test_send_ticket_batch_does_not_repost_text_when_an_album_fails(monkeypatch) -> None:
+    def media_ok(caption):
+        if caption == "Feedback #b":
+            raise OSError("attachment vanished")
+        return True
+
+    calls = _stub_telegram(monkeypatch, message_ok=lambda text: True, media_ok=media_ok)
+    batch = [_ticket("a", "A", files=1), _ticket("b", "B", files=2), _ticket("c", "C")]
+
+    sent = bot._send_ticket_batch(batch)
+
+    assert [call for call in calls if call[0] == "message"] == [("message", bot.TICKET_SEPARATOR.join("ABC"))]
+    assert [call[1] for call in calls if call[0] == "media"] == ["Feedback #a", "Feedback #b", "Feedback #c"]
+    assert sent == [batch[0].ticket_dir, batch[2].ticket_dir]
+
+
+def test_send_ticket_batch_falls_back_per_ticket_when_combined_text_fails(monkeypatch) -> None:
+    calls = _stub_telegram(
+        monkeypatch,
+        message_ok=lambda text: bot.TICKET_SEPARATOR not in text and text != "B",
+        media_ok=lambda caption: True,
+    )
+    batch = [_ticket("a", "A"), _ticket("b", "B"), _ticket("c", "C")]
+
+    sent = bot._send_ticket_batch(batch)
+
+    assert [call[1] for call in calls if call[0] == "message"] == [bot.TICKET_SEPARATOR.join("ABC"), "A", "B", "C"]
+    assert sent == [batch[0].ticket_dir, batch[2].ticket_dir]
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, payload: dict) -> None:
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self) -> dict:
+        return self._payload
+
+
+def test_post_telegram_waits_out_rate_limit(monkeypatch) -> None:
+    responses = [
+        _FakeResponse(429, {"ok": False, "parameters": {"retry_after": 7}}),
+        _FakeResponse(200, {"ok": True}),
+    ]
+    sleeps = []
+    monkeypatch.setattr(bot._SESSION, "post", lambda url, **kwargs: responses.pop(0))
+    monkeypatch.setattr(bot.time, "sleep", sleeps.append)
+    monkeypatch.setattr(bot, "TELEGRAM_MIN_CALL_INTERVAL", 0)
+    monkeypatch.setattr(bot, "_telegram_next_call", 0.0)
+
+    assert bot._send_message("token", "chat", "hello") is True
+    assert responses == []
+    assert sleeps == [pytest.approx(7, abs=0.5)]
+
+
+def test_drain_pending_sends_batches_in_order(monkeypatch, tmp_path) -> None:
+    pending = tmp_path / "pending"
+    for name in ("b", "a", "c"):
+        (pending / name).mkdir(parents=True)
+        (pending / name / "payload.json").write_text(f'{{"ticket_id": "{name}"}}', encoding="utf-8")
+    monkeypatch.setattr(bot, "TICKETS_PER_MESSAGE", 2)
+    sent_batches = []
+
+    def fake_send_ticket_batch(batch):
+        sent_batches.append([ticket.ticket_id for ticket in batch])
+        return [ticket.ticket_dir for ticket in batch]
+
+    monkeypatch.setattr(bot, "_send_ticket_batch", fake_send_ticket_batch)
+
+    assert bot._drain_pending(tmp_path) == 3
+    assert sent_batches == [["a", "b"], ["c"]]
+    assert list(pending.iterdir()) == []
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime
+from itertools import product
+from types import SimpleNamespace
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.core.enums import DocumentStatus, DocumentType, ValidationSeverity
+from app.models import Document, FilledField
+from app.services import validation
+from app.services.validation import (
+    GROUP_EQUALITY_RULES,
+    DateComparison,
+    ValidationContext,
+    _ALL_REFS,
+    _OPERATOR_FUNC,
+    _date_pairs_hold,
+    _date_range,
+    _field_keys_by_doc_type,
+    _json_safe,
+    _matrix_field_value,
+    _matrix_value_table,
+    _ref,
+)
+
+
+def _doc(doc_type: DocumentType, filename: str) -> Document:
+    return Document(
+        id=uuid4(),
+        batch_id=uuid4(),
+        filename=filename,
+        doc_type=doc_type,
+        status=DocumentStatus.FILLED_AUTO,
+    )
+
+
+def _fields(doc: Document, values: dict[str, str | None]) -> dict[str, FilledField]:
+    return {
+        key: FilledField(doc_id=doc.id, field_key=key, value=value, latest=True, version=1)
+        for key, value in values.items()
+    }
+
+
+def test_all_refs_cover_every_rule_table() -> None:
+    field_keys = _field_keys_by_doc_type(_ALL_REFS)
+
+    assert "invoice_date" in field_keys["INVOICE"]
+    assert "invoice_no" in field_keys["PACKING_LIST"]
+    for rule in GROUP_EQUALITY_RULES:
+        for ref in rule.refs:
+            assert ref.field_key in field_keys[ref.doc_type]
+
+
+def test_indexed_collect_matches_direct_lookup() -> None:
+    invoice = _doc(DocumentType.INVOICE, "invoice.pdf")
+    second_invoice = _doc(DocumentType.INVOICE, "invoice_2.pdf")
+    packing = _doc(DocumentType.PACKING_LIST, "packing.pdf")
+    fields_by_doc = {
+        invoice.id: _fields(invoice, {"invoice_date": "2024-01-05"}),
+        second_invoice.id: _fields(second_invoice, {"invoice_date": "not a date"}),
+        packing.id: _fields(packing, {"packing_list_date": " "}),
+    }
+    documents = [invoice, second_invoice, packing]
+
+    plain = ValidationContext(documents, fields_by_doc)
+    indexed = ValidationContext(documents, fields_by_doc, _ALL_REFS)
+
+    for ref in (_ref("INVOICE", "invoice_date"), _ref("PACKING_LIST", "packing_list_date"), _ref("CMR", "cmr_date")):
+        expected = plain.collect(ref, "date")
+        actual = indexed.collect(ref, "date")
+        assert [record.document.id for record in actual.records] == [record.document.id for record in expected.records]
+        assert [record.normalized for record in actual.records] == [record.normalized for record in expected.records]
+        assert [doc.id for doc in actual.missing_docs] == [doc.id for doc in expected.missing_docs]
+        assert [record.document.id for record in actual.invalid_records] == [
+            record.document.id for record in expected.invalid_records
+        ]
+        assert actual.doc_type_missing == expected.doc_type_missing
+
+
+def test_run_rules_keeps_rule_order_with_worker_threads(monkeypatch) -> None:
+    monkeypatch.setattr(validation, "get_settings", lambda: SimpleNamespace(validation_rule_workers=4))
+
+    results = validation._run_rules(lambda rule: [rule] * 2, list(range(20)))
+
+    assert results == [[rule] * 2 for rule in range(20)]
+
+
+def test_matrix_value_table_prefers_first_document_with_any_alias() -> None:
+    first = _doc(DocumentType.INVOICE, "invoice.pdf")
+    second = _doc(DocumentType.INVOICE, "invoice_2.pdf")
+    fields_by_doc = {
+        first.id: _fields(first, {"commodity_code": "", "invoice_no": "INV-1"}),
+        second.id: _fields(second, {"HS_code": "0302"}),
+    }
+    table = _matrix_value_table([first, second], fields_by_doc)
+
+    assert _matrix_field_value(table, "INVOICE", ["HS_code", "commodity_code"]) == ("", True)
+    assert _matrix_field_value(table, "INVOICE", ["HS_code"]) == ("0302", True)
+    assert _matrix_field_value(table, "INVOICE", ["invoice_no"]) == ("INV-1", True)
+    assert _matrix_field_value(table, "CMR", ["invoice_no"]) == ("", False)
+
+
+def test_collect_reuses_collection_per_ref_and_kind() -> None:
+    invoice = _doc(DocumentType.INVOICE, "invoice.pdf")
+    context = ValidationContext([invoice], {invoice.id: _fields(invoice, {"currency": " usd "})}, _ALL_REFS)
+    ref = _ref("INVOICE", "currency")
+
+    collection = context.collect(ref, "string-upper")
+
+    assert context.collect(ref, "string-upper") is collection
+    assert [record.normalized for record in collection.records] == ["USD"]
+    assert [record.normalized for record in context.collect(ref, "string").records] == ["usd"]
+
+
+def test_date_pairs_hold_matches_pairwise_comparison() -> None:
+    samples = [[date(2024, 1, 5)], [date(2024, 1, 5), date(2024, 1, 7)], [date(2024, 1, 6)], [date(2024, 1, 7)] * 2]
+    for operator_symbol, op_func in _OPERATOR_FUNC.items():
+        for anchor_dates, other_dates in product(samples, repeat=2):
+            anchors = [SimpleNamespace(normalized=value) for value in anchor_dates]
+            others = [SimpleNamespace(normalized=value) for value in other_dates]
+            expected = all(op_func(a, b) for a, b in product(anchor_dates, other_dates))
+            assert _date_pairs_hold(operator_symbol, _date_range(anchors), _date_range(others)) == expected
+
+
+def test_date_comparison_resolves_operator_up_front() -> None:
+    comparison = DateComparison(">=", _ref("CMR", "cmr_date"))
+
+    assert comparison.op_func is _OPERATOR_FUNC[">="]
+    assert comparison == DateComparison(">=", _ref("CMR", "cmr_date"))
+    with pytest.raises(ValueError):
+        DateComparison("=>", _ref("CMR", "cmr_date"))
+
+
+class _Stamp(datetime):
+    pass
+
+
+def test_json_safe_converts_subclasses_like_their_base() -> None:
+    pair = namedtuple("pair", "left right")
+    doc_id = UUID(int=1)
+
+    assert _json_safe(ValidationSeverity.WARN) is ValidationSeverity.WARN
+    assert _json_safe(_Stamp(2024, 1, 5, 10, 30)) == "2024-01-05T10:30:00"
+    assert _json_safe(OrderedDict(doc_id=doc_id)) == {"doc_id": str(doc_id)}
+    assert _json_safe(pair(date(2024, 1, 5), (doc_id, True))) == ["2024-01-05", [str(doc_id), True]]